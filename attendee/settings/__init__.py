@@ -4,22 +4,26 @@ This file loads the appropriate settings file based on the environment.
 """
 
 import os
-import importlib
-
-# Get the environment setting from the environment variable or default to development
-ENVIRONMENT = os.getenv("DJANGO_ENVIRONMENT", "development").lower()
 
 # Map environment names to settings modules
-SETTINGS_MODULE = {
+SETTINGS_MODULES = {
     "development": "attendee.settings.development",
     "production": "attendee.settings.production",
     "production-gke": "attendee.settings.production-gke",
     "staging-gke": "attendee.settings.staging-gke",
     "test": "attendee.settings.test",
-}.get(ENVIRONMENT, "attendee.settings.development")
+}
+
+# Set the settings module for Django to use, based on DJANGO_ENVIRONMENT (default development).
+# If one was already chosen, e.g. inherited from a parent process, there is nothing to dispatch.
+if "DJANGO_SETTINGS_MODULE" not in os.environ:
+    environment = os.getenv("DJANGO_ENVIRONMENT", "development").lower()
+    os.environ["DJANGO_SETTINGS_MODULE"] = SETTINGS_MODULES.get(environment, "attendee.settings.development")
 
-# Set the settings module for Django to use
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", SETTINGS_MODULE)
+SETTINGS_MODULE = os.environ["DJANGO_SETTINGS_MODULE"]
 
-# For direct imports in this module, make them from the base (development is the safest fallback)
-from .development import *  # noqa
+# When Django is pointed at this package itself (manage.py, wsgi, asgi, celery), serve the
+# development settings from here. When it is pointed at a specific submodule, Django imports
+# that module directly, so loading development as well would be wasted work.
+if SETTINGS_MODULE == __name__:
+    from .development import *  # noqa
@@ -5,49 +5,90 @@ Provides a safe fallback for database configuration when environment variables a
 
 import os
 from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
 
 # Get the project base directory (adjust the number of .parent calls based on file location)
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # ---- Database Configuration ----
+_env = os.environ
+
 # Prefer a single URL (Railway style). Accept a few common variants.
 _db_url = (
-    os.getenv("DATABASE_URL")
-    or os.getenv("POSTGRES_URL")
-    or os.getenv("POSTGRESURL")
+    _env.get("DATABASE_URL")
+    or _env.get("POSTGRES_URL")
+    or _env.get("POSTGRESURL")
 )
+_postgres_host = _env.get("POSTGRES_HOST")
+# Keep connections open between requests instead of reconnecting every time
+_conn_max_age = int(_env.get("DB_CONN_MAX_AGE", "600"))
+
+_POSTGRES_URL_SCHEMES = ("postgres", "postgresql", "pgsql")
+
+
+def _parse_postgres_url(url):
+    """
+    Parse a postgres:// URL into a Django database dict without importing dj-database-url.
+    Returns None for any other scheme.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in _POSTGRES_URL_SCHEMES:
+        return None
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": unquote(parts.path[1:]),
+        "USER": unquote(parts.username or ""),
+        "PASSWORD": unquote(parts.password or ""),
+        "HOST": unquote(parts.hostname or ""),
+        "PORT": parts.port or "",
+        "CONN_MAX_AGE": _conn_max_age,
+        "CONN_HEALTH_CHECKS": True,
+    }
+    options = dict(parse_qsl(parts.query))
+    if options:
+        config["OPTIONS"] = options
+    return config
+
 
 if _db_url:
-    # Use dj-database-url if available
-    try:
-        import dj_database_url  # type: ignore
-        DATABASES = {
-            "default": dj_database_url.parse(_db_url, conn_max_age=600)
-        }
-    except ImportError:
-        # Fallback if dj-database-url is not installed
-        DATABASES = {
-            "default": {
-                "ENGINE": "django.db.backends.postgresql",
-                "NAME": os.getenv("DB_NAME", "attendee_development"),
-                "USER": os.getenv("DB_USER", os.getenv("POSTGRES_USER", "attendee_development_user")),
-                "PASSWORD": os.getenv("DB_PASSWORD", os.getenv("POSTGRES_PASSWORD", "attendee_development_user")),
-                "HOST": os.getenv("DB_HOST", os.getenv("POSTGRES_HOST", "localhost")),
-                "PORT": os.getenv("DB_PORT", "5432"),
+    _parsed_db_config = _parse_postgres_url(_db_url)
+    if _parsed_db_config:
+        DATABASES = {"default": _parsed_db_config}
+    else:
+        # Other database URLs, use dj-database-url if available
+        try:
+            import dj_database_url  # type: ignore
+
+            DATABASES = {
+                "default": dj_database_url.parse(_db_url, conn_max_age=_conn_max_age, conn_health_checks=True)
+            }
+        except ImportError:
+            # Fallback if dj-database-url is not installed
+            DATABASES = {
+                "default": {
+                    "ENGINE": "django.db.backends.postgresql",
+                    "NAME": _env.get("DB_NAME", "attendee_development"),
+                    "USER": _env.get("DB_USER") or _env.get("POSTGRES_USER", "attendee_development_user"),
+                    "PASSWORD": _env.get("DB_PASSWORD") or _env.get("POSTGRES_PASSWORD", "attendee_development_user"),
+                    "HOST": _env.get("DB_HOST") or _postgres_host or "localhost",
+                    "PORT": _env.get("DB_PORT", "5432"),
+                    "CONN_MAX_AGE": _conn_max_age,
+                    "CONN_HEALTH_CHECKS": True,
+                }
             }
-        }
 else:
     # Use explicitly defined database parameters if available
-    postgres_host = os.getenv("POSTGRES_HOST")
-    if postgres_host:
+    if _postgres_host:
         DATABASES = {
             "default": {
                 "ENGINE": "django.db.backends.postgresql",
-                "NAME": os.getenv("POSTGRES_DB", "attendee_development"),
-                "USER": os.getenv("POSTGRES_USER", "attendee_development_user"),
-                "PASSWORD": os.getenv("POSTGRES_PASSWORD", "attendee_development_user"),
-                "HOST": postgres_host,
-                "PORT": os.getenv("POSTGRES_PORT", "5432"),
+                "NAME": _env.get("POSTGRES_DB", "attendee_development"),
+                "USER": _env.get("POSTGRES_USER", "attendee_development_user"),
+                "PASSWORD": _env.get("POSTGRES_PASSWORD", "attendee_development_user"),
+                "HOST": _postgres_host,
+                "PORT": _env.get("POSTGRES_PORT", "5432"),
+                "CONN_MAX_AGE": _conn_max_age,
+                "CONN_HEALTH_CHECKS": True,
             }
         }
     else:
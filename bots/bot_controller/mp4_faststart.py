@@ -0,0 +1,156 @@
+import logging
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+# Atoms we need to descend into to reach the chunk offset tables
+CONTAINER_ATOMS = frozenset((b"moov", b"trak", b"mdia", b"minf", b"stbl"))
+
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def read_top_level_atoms(f):
+    """
+    Return a list of (atom_type, offset, size) for the top-level atoms of an MP4/MOV file.
+    Raises ValueError if the atom structure is malformed.
+    """
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    atoms = []
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        size, atom_type = struct.unpack(">I4s", f.read(8))
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+        elif size == 0:
+            size = file_size - offset
+        if size < 8 or offset + size > file_size:
+            raise ValueError(f"Malformed atom {atom_type!r} at offset {offset}")
+        atoms.append((atom_type, offset, size))
+        offset += size
+    return atoms
+
+
+def moov_precedes_mdat(path):
+    """Return True if the file is an MP4/MOV whose moov atom already comes before the media data."""
+    try:
+        with open(path, "rb") as f:
+            atom_types = [atom[0] for atom in read_top_level_atoms(f)]
+    except (OSError, ValueError, struct.error):
+        return False
+    if b"moov" not in atom_types:
+        return False
+    return b"mdat" not in atom_types or atom_types.index(b"moov") < atom_types.index(b"mdat")
+
+
+def _shift_chunk_offsets(moov, shift):
+    """Add shift to every stco/co64 entry in the moov atom (in place). Returns False if an stco entry would overflow."""
+    moov_header_size = 16 if struct.unpack_from(">I", moov, 0)[0] == 1 else 8
+    pending = [(moov_header_size, len(moov))]
+    while pending:
+        offset, end = pending.pop()
+        while offset + 8 <= end:
+            size, atom_type = struct.unpack_from(">I4s", moov, offset)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack_from(">Q", moov, offset + 8)[0]
+                header_size = 16
+            if size < header_size or offset + size > end:
+                raise ValueError(f"Malformed atom {atom_type!r} inside moov")
+
+            if atom_type in CONTAINER_ATOMS:
+                pending.append((offset + header_size, offset + size))
+            elif atom_type == b"cmov":
+                raise ValueError("Compressed moov atoms are not supported")
+            elif atom_type in (b"stco", b"co64"):
+                entry_format = ">I" if atom_type == b"stco" else ">Q"
+                entry_size = struct.calcsize(entry_format)
+                # Entry count follows the version/flags field
+                entry_count = struct.unpack_from(">I", moov, offset + header_size + 4)[0]
+                entries_start = offset + header_size + 8
+                for i in range(entry_count):
+                    position = entries_start + i * entry_size
+                    new_value = struct.unpack_from(entry_format, moov, position)[0] + shift
+                    if atom_type == b"stco" and new_value > 0xFFFFFFFF:
+                        return False
+                    struct.pack_into(entry_format, moov, position, new_value)
+            offset += size
+    return True
+
+
+def _copy_range(src, dst, offset, count):
+    """Copy count bytes starting at offset from src to the current position of dst"""
+    dst.flush()
+    # copy_file_range lets filesystems with reflinks (XFS, btrfs) share the media data
+    # instead of copying it, sendfile at least keeps the copy in the kernel
+    kernel_copies = []
+    if hasattr(os, "copy_file_range"):
+        kernel_copies.append(lambda position, chunk: os.copy_file_range(src.fileno(), dst.fileno(), chunk, position))
+    kernel_copies.append(lambda position, chunk: os.sendfile(dst.fileno(), src.fileno(), position, chunk))
+    for kernel_copy in kernel_copies:
+        try:
+            while count > 0:
+                sent = kernel_copy(offset, min(count, COPY_CHUNK_SIZE))
+                if sent == 0:
+                    break
+                offset += sent
+                count -= sent
+            break
+        except OSError:
+            continue
+    else:
+        # Neither is supported between these files, finish through userspace instead
+        src.seek(offset)
+        while count > 0:
+            data = src.read(min(count, COPY_CHUNK_SIZE))
+            if not data:
+                break
+            dst.write(data)
+            count -= len(data)
+    if count > 0:
+        raise IOError("Unexpected end of file while copying media data")
+
+
+def make_mp4_faststart(input_path, output_path):
+    """
+    Write a copy of an MP4/MOV file with the moov atom moved in front of the media data,
+    like qt-faststart. Unlike an ffmpeg remux with +faststart, the input is read once and
+    the output written once.
+
+    Returns True if output_path was written, False if the file can't be handled here
+    (moov already first, unexpected layout, offsets that would overflow) and the caller
+    should fall back to something else.
+    """
+    with open(input_path, "rb") as src:
+        if hasattr(os, "posix_fadvise"):
+            # The media data is read front to back exactly once, let the kernel read ahead aggressively
+            os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        atoms = read_top_level_atoms(src)
+        atom_types = [atom[0] for atom in atoms]
+        if b"moov" not in atom_types or b"mdat" not in atom_types:
+            logger.info(f"No moov/mdat atoms found in {input_path}, can't apply faststart")
+            return False
+        if atom_types.index(b"moov") < atom_types.index(b"mdat"):
+            logger.info(f"moov atom already precedes mdat in {input_path}")
+            return False
+        if atom_types[-1] != b"moov":
+            logger.info(f"moov atom is not the last atom in {input_path}, can't apply faststart")
+            return False
+
+        _, moov_offset, moov_size = atoms[-1]
+        # Keep a leading ftyp in front, everything else moves behind the moov atom
+        prefix_size = atoms[0][2] if atom_types[0] == b"ftyp" else 0
+
+        src.seek(moov_offset)
+        moov = bytearray(src.read(moov_size))
+        if not _shift_chunk_offsets(moov, moov_size):
+            logger.info(f"Chunk offsets in {input_path} would overflow 32 bits, can't apply faststart")
+            return False
+
+        with open(output_path, "wb") as dst:
+            _copy_range(src, dst, 0, prefix_size)
+            dst.write(moov)
+            _copy_range(src, dst, prefix_size, moov_offset - prefix_size)
+    return True
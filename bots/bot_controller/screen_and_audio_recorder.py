@@ -1,12 +1,361 @@
+import collections
+import concurrent.futures
+import ctypes
+import functools
+import glob
+import json
 import logging
 import os
 import subprocess
 import time
 import tempfile
+import threading
 import re
+import select
+import shutil
+import signal
+import weakref
+
+from .mp4_faststart import make_mp4_faststart, moov_precedes_mdat
 
 logger = logging.getLogger(__name__)
 
+MP4_EXTENSIONS = ('.mp4', '.mov', '.m4a')
+# Containers without a moov atom, which a faststart remux does nothing for
+NON_MP4_EXTENSIONS = ('.webm', '.mkv', '.ts')
+
+# Hardened FFmpeg capture of the meeting audio from ChromeSink.monitor, with an explicit format to prevent white noise
+CHROMESINK_AUDIO_INPUT_OPTIONS = (
+    "-f", "pulse",
+    "-channels", "2",
+    "-sample_rate", "48000",
+    "-sample_fmt", "s16",  # Explicit s16 to avoid float32→s16 noise
+    # 50ms fragments (48000 Hz * 2 channels * 2 bytes / 20), so PulseAudio hands over audio in small,
+    # regular chunks instead of whatever fragment size the server would pick
+    "-fragment_size", str(48000 * 2 * 2 // 20),
+    "-guess_layout_max", "0",
+    "-i", "ChromeSink.monitor",
+)
+
+# The same capture in mono for audio-only recordings, so PulseAudio downmixes and ffmpeg has no channel conversion left to do
+CHROMESINK_MONO_AUDIO_INPUT_OPTIONS = (
+    "-f", "pulse",
+    "-channels", "1",
+    "-sample_rate", "48000",
+    "-sample_fmt", "s16",
+    "-fragment_size", str(48000 * 1 * 2 // 20),
+    "-guess_layout_max", "0",
+    "-i", "ChromeSink.monitor",
+)
+
+# Traditional audio sources to fall back to when ChromeSink isn't available, in order of preference.
+# Each entry is (ffmpeg input options, description, backend the host needs for it to work).
+FALLBACK_AUDIO_METHODS = (
+    (("-f", "pulse", "-ac", "2", "-ar", "48000", "-sample_fmt", "s16", "-i", "default"), "PulseAudio default", 'pulse'),
+    (("-f", "alsa",  "-ac", "2", "-ar", "48000", "-i", "default"), "ALSA default", 'alsa_config'),
+    (("-f", "alsa",  "-ac", "2", "-ar", "48000", "-i", "hw:0"),    "ALSA hw:0", 'sound_devices'),
+)
+
+# Start writing as soon as the first packets arrive instead of analyzing the stream for up to 5s
+LOW_LATENCY_INPUT_OPTIONS = ["-analyzeduration", "0", "-fflags", "nobuffer"]
+
+# ffmpeg errors that mean the audio input is what broke a recording
+AUDIO_ERROR_PATTERNS = (
+    "no such process",
+    "input/output error",
+    "alsa",
+    "pulse",
+    "audio device",
+    "default:",
+    "cannot open audio device",
+    "no such file or directory",
+    "chromesink.monitor",
+    "device or resource busy",         # Common PulseAudio error
+    "connection timed out",            # Network/socket issues
+    "invalid argument",                # Format mismatch errors
+)
+
+# ffmpeg errors that definitively rule out an audio input during probing
+AUDIO_PROBE_FAILURE_PATTERNS = (
+    "input/output error",
+    "no such file or directory",
+    "no such process",
+    "cannot open audio device",
+    "connection refused",
+    "permission denied",
+)
+
+# Each list compiled into one case-insensitive alternation, so the output is scanned once instead of once per pattern
+_AUDIO_ERROR_RE = re.compile("|".join(map(re.escape, AUDIO_ERROR_PATTERNS)), re.IGNORECASE)
+_AUDIO_PROBE_FAILURE_RE = re.compile("|".join(map(re.escape, AUDIO_PROBE_FAILURE_PATTERNS)), re.IGNORECASE)
+
+# Parsing of volumedetect output, `pactl list sink-inputs` text output and ALSA device names
+_VOLUME_RE = re.compile(r"max_volume:\s*([-\d.]+)\s*dB")
+_PACTL_PROPERTY_RE = re.compile(r'^\s*([\w.]+) = "(.*)"$', re.MULTILINE)
+_ALSA_HW_DEVICE_RE = re.compile(r"hw:(\d+)(?:,(\d+))?")
+_PACMD_ERROR_RE = re.compile(r"Failed to|No sink|You need to")
+_CHROME_RE = re.compile(r"chrom(?:e|ium)", re.IGNORECASE)
+_VAAPI_H264_ENCODE_RE = re.compile(r"VAProfileH264\w*\s*:\s*VAEntrypointEncSlice")
+
+# module-null-sink arguments for ChromeSink, in the 48kHz stereo format Meet uses
+CHROMESINK_MODULE_ARGS = ("sink_name=ChromeSink", "sink_properties=device.description=ChromeSink", "rate=48000", "channels=2")
+
+# Sink input properties that identify Chrome's audio streams
+CHROME_SINK_INPUT_PROPERTIES = {
+    "application.name": frozenset(("Google Chrome", "Chromium", "Chrome", "chrome", "chromium")),
+    "application.process.binary": frozenset(("chrome", "chromium", "google-chrome")),
+    "media.role": frozenset(("phone",)),  # WebRTC audio often has this role
+}
+
+# How long a successful `pactl info` (or other proof the server answers) is trusted before asking again
+PULSE_INFO_TTL_SECONDS = 2.0
+
+# How long to wait for a freshly started PulseAudio daemon to answer, and the first/longest gap between checks
+PULSE_START_TIMEOUT_SECONDS = 2.0
+PULSE_START_POLL_INITIAL_SECONDS = 0.05
+PULSE_START_POLL_MAX_SECONDS = 0.3
+
+# How long a `pactl -f json list` snapshot is reused, kept below the intervals the sink/source waits poll at
+PACTL_SNAPSHOT_TTL_SECONDS = 0.2
+
+# Upper bound on how long a wait for a PulseAudio sink/source goes without rechecking, in case an event is missed
+PULSE_EVENT_RECHECK_SECONDS = 0.5
+
+# Length of the direct ChromeSink.monitor read used to look for an audio signal (100ms of 48kHz mono S16)
+MONITOR_PEAK_READ_BYTES = 9600
+
+# Peak S16 sample magnitude up to which ChromeSink.monitor counts as silent (about -60 dBFS), so dither
+# and a noise floor aren't mistaken for meeting audio
+MONITOR_SILENCE_PEAK = 32
+
+# How often the recording file is handed to writeback and dropped from the page cache while ffmpeg writes it
+PAGE_CACHE_TRIM_INTERVAL_SECONDS = 30
+
+# sync_file_range(2) flag that starts writeback of dirty pages in the range without waiting for it
+SYNC_FILE_RANGE_WRITE = 2
+
+_TRUTHY = frozenset(('1', 'true', 'yes', 'on'))
+
+
+def _envbool(key):
+    """Interpret an environment variable as a boolean flag"""
+    value = os.environ.get(key)
+    return bool(value) and value.lower() in _TRUTHY
+
+
+VAAPI_RENDER_DEVICE = '/dev/dri/renderD128'
+
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_path():
+    """
+    Absolute path of the ffmpeg binary, resolved once per process. Launching by absolute path
+    skips the PATH search on every spawn and lets subprocess use posix_spawn where it can.
+    """
+    return shutil.which("ffmpeg") or "ffmpeg"
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_hw_encoder():
+    """
+    Return the name of a usable hardware H.264 encoder ('h264_vaapi' or 'h264_nvenc'), or None.
+    Probes ffmpeg's encoder list once per process.
+    """
+    try:
+        result = subprocess.run([_ffmpeg_path(), "-hide_banner", "-encoders"], stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=5)
+    except Exception as e:
+        logger.warning(f"Could not list ffmpeg encoders: {e}")
+        return None
+
+    if result.returncode != 0:
+        return None
+    if "h264_vaapi" in result.stdout and os.path.exists(VAAPI_RENDER_DEVICE) and _vaapi_can_encode_h264():
+        return "h264_vaapi"
+    if "h264_nvenc" in result.stdout and shutil.which("nvidia-smi"):
+        return "h264_nvenc"
+    return None
+
+
+def _vaapi_can_encode_h264():
+    """
+    Whether the VAAPI driver behind VAAPI_RENDER_DEVICE offers an H.264 encode entrypoint, according
+    to vainfo. A render node alone doesn't mean that, e.g. some GPUs only decode. Without vainfo the
+    device is trusted, as before.
+    """
+    vainfo = shutil.which("vainfo")
+    if vainfo is None:
+        return True
+    try:
+        result = subprocess.run([vainfo, "--display", "drm", "--device", VAAPI_RENDER_DEVICE], stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=5)
+    except Exception as e:
+        logger.warning(f"Could not run vainfo: {e}")
+        return False
+    if result.returncode != 0:
+        logger.info(f"vainfo failed on {VAAPI_RENDER_DEVICE}, not using VAAPI encoding")
+        return False
+    if not _VAAPI_H264_ENCODE_RE.search(result.stdout):
+        logger.info(f"VAAPI driver on {VAAPI_RENDER_DEVICE} has no H.264 encode profile, not using VAAPI encoding")
+        return False
+    return True
+
+
+def _wait_for_exit(proc, timeout):
+    """
+    proc.wait(timeout=timeout), but sleeping in the kernel on a pidfd until the process exits
+    rather than waking up every few milliseconds to poll it. Raises subprocess.TimeoutExpired.
+    """
+    if proc.poll() is not None:
+        # Already reaped, its pid may belong to another process by now
+        return proc.returncode
+    try:
+        pidfd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        # No pidfd support (Python < 3.9, Linux < 5.3)
+        return proc.wait(timeout=timeout)
+    try:
+        if not select.select([pidfd], [], [], timeout)[0]:
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+    finally:
+        os.close(pidfd)
+    return proc.wait()
+
+
+def _release_ffmpeg_proc(proc):
+    """
+    weakref.finalize callback for a recorder dropped (or an interpreter exiting) while ffmpeg
+    still runs. Asks ffmpeg to finish the file on its own instead of blocking until it has.
+    """
+    if proc.poll() is not None:
+        return
+    try:
+        proc.send_signal(signal.SIGINT)
+    except ProcessLookupError:
+        return
+    try:
+        proc.wait(timeout=0.2)
+    except subprocess.TimeoutExpired:
+        pass
+
+
+def _run_pactl(*args, timeout=5, capture_stderr=False):
+    """
+    Run a pactl command with its stdout captured as text. stderr is discarded unless capture_stderr
+    is set, as most callers only look at the return code. Raises subprocess.TimeoutExpired like subprocess.run.
+    """
+    return subprocess.run(["pactl", *args], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL, text=True, timeout=timeout)
+
+
+def _run_pacmd(commands, timeout=5):
+    """
+    Run several PulseAudio CLI commands through one pacmd process and server connection.
+    Returns the error lines pacmd printed (empty when every command succeeded), or None if
+    pacmd couldn't be used at all, e.g. it is missing under pipewire-pulse or no daemon answers.
+    """
+    try:
+        result = subprocess.run(["pacmd"], input="".join(f"{command}\n" for command in commands), capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.debug(f"pacmd unavailable: {e}")
+        return None
+    if result.returncode != 0:
+        logger.debug(f"pacmd failed: {result.stderr.strip()}")
+        return None
+    return [line for line in (result.stdout + result.stderr).splitlines() if _PACMD_ERROR_RE.search(line)]
+
+
+def _mkdir_if_absent(path):
+    """Create a directory, without the per-component stat() calls of os.makedirs in the common cases"""
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+@functools.lru_cache(maxsize=1)
+def _sync_file_range():
+    """libc's sync_file_range (not exposed by os), looked up once per process, or None where it isn't available"""
+    try:
+        sync_file_range = ctypes.CDLL(None, use_errno=True).sync_file_range
+    except (OSError, AttributeError):
+        return None
+    sync_file_range.argtypes = (ctypes.c_int, ctypes.c_int64, ctypes.c_int64, ctypes.c_uint)
+    sync_file_range.restype = ctypes.c_int
+    return sync_file_range
+
+
+@functools.lru_cache(maxsize=1)
+def _pulsectl_module():
+    """
+    The pulsectl module (checked once per process), or None if it can't be loaded, e.g. on a host
+    without libpulse, and pactl is used instead
+    """
+    try:
+        import pulsectl
+    except (ImportError, OSError):
+        return None
+    return pulsectl
+
+
+@functools.lru_cache(maxsize=1)
+def _pasimple_module():
+    """
+    The pasimple module (checked once per process), or None if it can't be loaded, e.g. on a host
+    without libpulse-simple, and ffmpeg is used instead
+    """
+    try:
+        import pasimple
+    except (ImportError, OSError):
+        return None
+    return pasimple
+
+
+@functools.lru_cache(maxsize=1)
+def _xlib_display_module():
+    """The Xlib.display module from python-xlib (checked once per process), or None if it can't be imported and xterm is used instead"""
+    try:
+        from Xlib import display
+    except ImportError:
+        return None
+    return display
+
+
+@functools.lru_cache(maxsize=1)
+def _audio_disabled():
+    """Whether audio recording is disabled via DISABLE_AUDIO_RECORDING (read once per process)."""
+    return _envbool('DISABLE_AUDIO_RECORDING')
+
+
+class _ProbeProcesses:
+    """
+    ffmpeg processes of audio probes running concurrently. Once the caller has its answer it cancels
+    them, which also covers probes that are still starting and only get their process afterwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._procs = []
+        self._cancelled = False
+
+    def add(self, proc):
+        """Track a probe's process. Returns False, after killing it, if the probes were already cancelled."""
+        with self._lock:
+            if not self._cancelled:
+                self._procs.append(proc)
+                return True
+        proc.kill()
+        return False
+
+    def cancel(self):
+        """Kill the tracked processes that are still running, and any added from now on"""
+        with self._lock:
+            self._cancelled = True
+            procs = list(self._procs)
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+
 
 class ScreenAndAudioRecorder:
     """
@@ -26,42 +375,64 @@ class ScreenAndAudioRecorder:
     
     This ensures Chrome's audio is properly routed to ChromeSink for capture.
     """
-    def __init__(self, file_location, recording_dimensions, audio_only):
+
+    # Fallback audio probe results shared across recorder instances, keyed by _audio_host_fingerprint()
+    _audio_options_cache = {}
+    # _audio_host_fingerprint() of the host setup on which recording with audio last failed. Later recordings
+    # go straight to video-only until the fingerprint changes
+    _audio_failed_fingerprint = None
+    # Set to False once pactl turns out not to support JSON output
+    _pactl_json_supported = None
+
+    def __init__(self, file_location, recording_dimensions, audio_only, thread_queue_size=None):
         self.file_location = file_location
+        # Packets each ffmpeg input can queue while the encoder is busy, before the input blocks or drops
+        self.thread_queue_size = thread_queue_size or int(os.environ.get('FFMPEG_THREAD_QUEUE_SIZE', 4096))
         self.ffmpeg_proc = None
-        # Screen will have buffer, we will crop to the recording dimensions
-        self.screen_dimensions = (recording_dimensions[0] + 10, recording_dimensions[1] + 10)
+        # Screen has a 10px buffer; we grab only the recording area at that offset instead of cropping every frame
+        self.capture_offset = (10, 10)
+        self.screen_dimensions = (recording_dimensions[0] + self.capture_offset[0], recording_dimensions[1] + self.capture_offset[1])
         self.recording_dimensions = recording_dimensions
         self.audio_only = audio_only
         self.paused = False
         self.xterm_proc = None
+        # Black override-redirect window shown during pauses, created on the first pause
+        self._blackout_display = None
+        self._blackout_window = None
+        self.sink_mute_proc = None
+        # Two workers that apply the blackout and the sink mute of a pause/resume side by side
+        self._pause_pool = None
+        self.page_cache_trim_stop = None
+        self.ffmpeg_finalizer = None
+        self._pulse = None
+        # Separate pulsectl client for the pause pool, see _get_pause_pulse
+        self._pause_pulse = None
+        self._pactl_snapshot_cache = None
+        # Index of the module-null-sink this recorder loaded for ChromeSink, while it is known to be loaded
+        self._chromesink_module_idx = None
+        # When the PulseAudio server last answered, see _pulse_running
+        self._pulse_ready_at = None
         self.ffmpeg_log_file = None
+        # Last lines ffmpeg wrote to stderr, kept in memory and only written to ffmpeg_log_file on failure
+        self.ffmpeg_stderr_tail = collections.deque(maxlen=256)
+        self.ffmpeg_stderr_thread = None
         self.recording_started_time = None
         self.pulseaudio_setup_attempted = False
         # New optimization attributes
         self.ffmpeg_thread_count = 2
         self.audio_resampler = 'speex-float-3'
 
-    def __del__(self):
-        """Ensure ffmpeg process is cleaned up on object destruction"""
-        try:
-            if self.ffmpeg_proc and self.ffmpeg_proc.poll() is None:
-                logger.warning("FFmpeg process still running during cleanup, terminating")
-                self.stop_recording()
-        except:
-            pass  # Ignore errors during cleanup
-
     def _get_audio_input_options(self):
         """
         Detect available audio input options and return appropriate FFmpeg parameters.
         Returns None if no audio input is available.
         """
         # Hard disable via env
-        if os.environ.get('DISABLE_AUDIO_RECORDING', '').lower() in ('1', 'true', 'yes'):
+        if _audio_disabled():
             logger.info("Audio recording disabled by environment variable DISABLE_AUDIO_RECORDING")
             return None
 
-        force_pulse = os.environ.get('FORCE_PULSE', '').lower() in ('1', 'true', 'yes')
+        force_pulse = _envbool('FORCE_PULSE')
 
         # Always ensure PulseAudio is running if we plan to use it
         if force_pulse or not self.pulseaudio_setup_attempted:
@@ -74,16 +445,7 @@ class ScreenAndAudioRecorder:
         if force_pulse:
             if self._wait_for_chromesink_monitor(timeout_sec=5):
                 logger.info("Using PulseAudio ChromeSink.monitor for meeting audio")
-                # Hardened FFmpeg audio capture with explicit format to prevent white noise
-                return [
-                    "-thread_queue_size", "4096", 
-                    "-f", "pulse", 
-                    "-channels", "2", 
-                    "-sample_rate", "48000", 
-                    "-sample_fmt", "s16",  # Explicit s16 to avoid float32→s16 noise
-                    "-guess_layout_max", "0",
-                    "-i", "ChromeSink.monitor"
-                ]
+                return list(CHROMESINK_AUDIO_INPUT_OPTIONS)
             else:
                 logger.warning("FORCE_PULSE requested but ChromeSink.monitor not found; falling back to Pulse default")
                 # fall through to default detection
@@ -91,46 +453,333 @@ class ScreenAndAudioRecorder:
         # If ChromeSink exists (from earlier setup), use it with hardened parameters
         if self._check_pulseaudio_chromesink_exists() and self._wait_for_chromesink_monitor(timeout_sec=2):
             logger.info("Found existing ChromeSink.monitor, using it for meeting audio")
-            return [
-                "-thread_queue_size", "4096", 
-                "-f", "pulse", 
-                "-channels", "2", 
-                "-sample_rate", "48000", 
-                "-sample_fmt", "s16",  # Explicit s16 to prevent noise
-                "-guess_layout_max", "0",
-                "-i", "ChromeSink.monitor"
-            ]
+            return list(CHROMESINK_AUDIO_INPUT_OPTIONS)
 
         # Fallbacks with safer parameters
         logger.warning("PulseAudio ChromeSink not available, falling back to traditional audio sources")
-        audio_methods = [
-            (["-thread_queue_size", "4096", "-f", "pulse", "-ac", "2", "-ar", "48000", "-sample_fmt", "s16", "-i", "default"], "PulseAudio default"),
-            (["-thread_queue_size", "4096", "-f", "alsa",  "-ac", "2", "-ar", "48000", "-i", "default"], "ALSA default"),
-            (["-thread_queue_size", "4096", "-f", "alsa",  "-ac", "2", "-ar", "48000", "-i", "hw:0"],    "ALSA hw:0"),
-        ]
-        for audio_cmd, description in audio_methods:
-            if self._test_audio_input(audio_cmd, description):
-                logger.info(f"Using fallback audio input method: {description}")
-                return audio_cmd
+        return self._get_fallback_audio_input_options()
+
+    @staticmethod
+    def _audio_host_fingerprint():
+        """Cheap description of the host's audio setup, used as the fallback probe cache key"""
+        return (_audio_disabled(), os.path.exists('/dev/snd'), os.environ.get('PULSE_SERVER'))
+
+    @classmethod
+    def clear_audio_cache(cls):
+        """Forget cached fallback audio probe results and past audio failures (e.g. after the audio setup changed)"""
+        cls._audio_options_cache.clear()
+        cls._audio_failed_fingerprint = None
+
+    @staticmethod
+    def _pulse_server_available():
+        """Check for a reachable PulseAudio server address without spawning anything"""
+        if os.environ.get('PULSE_SERVER'):
+            return True
+        xdg_runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+        if xdg_runtime_dir and os.path.exists(os.path.join(xdg_runtime_dir, 'pulse', 'native')):
+            return True
+        return bool(glob.glob('/run/user/*/pulse/native'))
+
+    def _get_fallback_audio_input_options(self):
+        """
+        Probe the traditional audio sources and return FFmpeg parameters for the first one that works.
+        The result is cached per host fingerprint, since the available backend rarely changes
+        during a container's lifetime and each probe spawns an ffmpeg process. Set
+        FORCE_AUDIO_REPROBE to ignore the cache.
+        """
+        fingerprint = self._audio_host_fingerprint()
+        if fingerprint in self._audio_options_cache and not _envbool('FORCE_AUDIO_REPROBE'):
+            cached = self._audio_options_cache[fingerprint]
+            logger.info("Using cached fallback audio input probe result")
+            return list(cached) if cached else None
+
+        audio_options = None
+        has_sound_devices = os.path.exists('/dev/snd')
+        available_backends = {
+            'pulse': self._pulse_server_available(),
+            'alsa_config': has_sound_devices or os.path.exists('/etc/asound.conf') or os.path.exists(os.path.expanduser('~/.asoundrc')),
+            'sound_devices': has_sound_devices,
+        }
+        # Skip methods that are doomed on this host rather than spawning ffmpeg to find out
+        audio_methods = []
+        for audio_cmd, description, requirement in FALLBACK_AUDIO_METHODS:
+            if available_backends[requirement]:
+                audio_methods.append((audio_cmd, description))
+            else:
+                logger.debug(f"Skipping audio probe for {description}, backend not present on this host")
+        if not audio_methods:
+            logger.warning("No working audio input found, will record video only")
+            self._audio_options_cache[fingerprint] = None
+            return None
+
+        # Probe all methods concurrently (each probe is a short-lived ffmpeg process),
+        # but still pick the first working method in preference order
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(audio_methods))
+        probe_procs = _ProbeProcesses()
+        try:
+            futures = [executor.submit(self._test_audio_input, audio_cmd, description, probe_procs) for audio_cmd, description in audio_methods]
+            for future, (audio_cmd, description) in zip(futures, audio_methods):
+                if future.result():
+                    logger.info(f"Using fallback audio input method: {description}")
+                    audio_options = list(audio_cmd)
+                    break
+        finally:
+            # Don't block on lower-priority probes once a winner is found, and stop their ffmpeg processes
+            executor.shutdown(wait=False, cancel_futures=True)
+            probe_procs.cancel()
+
+        if audio_options is None:
+            logger.warning("No working audio input found, will record video only")
+
+        self._audio_options_cache[fingerprint] = tuple(audio_options) if audio_options else None
+        return audio_options
+
+    def _get_pulse(self):
+        """
+        Return a connected pulsectl client, reconnecting if the previous connection was lost.
+        Returns None if pulsectl can't be loaded or the server can't be reached; callers then use pactl.
+        The client isn't thread-safe, so the concurrent audio probes keep using pactl and the
+        pause path has a connection of its own.
+        """
+        pulsectl = _pulsectl_module()
+        if pulsectl is None:
+            return None
+        if self._pulse is not None and self._pulse.connected:
+            return self._pulse
+        if self._pulse is not None:
+            # Lost the server, it may have been restarted without our sink
+            self._chromesink_module_idx = None
+            self._pulse.close()
+            self._pulse = None
+        try:
+            self._pulse = pulsectl.Pulse("attendee-recorder")
+        except Exception as e:
+            logger.debug(f"Could not connect to PulseAudio with pulsectl: {e}")
+        return self._pulse
+
+    def _get_pause_pulse(self):
+        """
+        Return the pulsectl client used to mute the sink on pause/resume, connecting if needed, or
+        None to use pactl. Pauses are applied on the pause pool while the main client may be in use,
+        or blocked in event_listen, on the thread that joins the meeting, so they get their own connection.
+        """
+        pulsectl = _pulsectl_module()
+        if pulsectl is None:
+            return None
+        if self._pause_pulse is not None and self._pause_pulse.connected:
+            return self._pause_pulse
+        self._close_pause_pulse()
+        try:
+            self._pause_pulse = pulsectl.Pulse("attendee-recorder-pause")
+        except Exception as e:
+            logger.debug(f"Could not connect to PulseAudio with pulsectl for pausing: {e}")
+        return self._pause_pulse
 
-        logger.warning("No working audio input found, will record video only")
+    def _close_pause_pulse(self):
+        if self._pause_pulse is not None:
+            self._pause_pulse.close()
+            self._pause_pulse = None
+
+    def _close_pulse(self):
+        self._chromesink_module_idx = None
+        self._pulse_ready_at = None
+        if self._pulse is not None:
+            self._pulse.close()
+            self._pulse = None
+
+    def _pactl_snapshot(self):
+        """
+        Return the PulseAudio objects from a single `pactl -f json list` as a dict of lists keyed by
+        type ("sinks", "sources", "sink_inputs", "clients", ...), reused for PACTL_SNAPSHOT_TTL_SECONDS.
+        Returns None if pactl fails or doesn't support JSON output.
+        """
+        if self._pactl_json_supported is False:
+            return None
+        now = time.monotonic()
+        if self._pactl_snapshot_cache and now - self._pactl_snapshot_cache[0] < PACTL_SNAPSHOT_TTL_SECONDS:
+            return self._pactl_snapshot_cache[1]
+
+        try:
+            result = _run_pactl("-f", "json", "list", capture_stderr=True)
+        except Exception as e:
+            logger.debug(f"pactl failed to list PulseAudio objects: {e}")
+            return None
+        if result.returncode != 0:
+            if "option" in result.stderr:
+                ScreenAndAudioRecorder._pactl_json_supported = False
+            else:
+                self._pulse_ready_at = None
+            return None
+        try:
+            data = json.loads(result.stdout)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            logger.info("pactl doesn't support JSON output, listing PulseAudio objects one type at a time")
+            ScreenAndAudioRecorder._pactl_json_supported = False
+            return None
+
+        snapshot = {key.replace("-", "_"): value for key, value in data.items()}
+        self._pactl_snapshot_cache = (now, snapshot)
+        self._pulse_ready_at = now
+        return snapshot
+
+    def _list_pulse_names(self, kind):
+        """
+        Return the set of PulseAudio sink or source names (kind is "sinks" or "sources"),
+        or None if they can't be listed.
+        """
+        pulse = self._get_pulse()
+        if pulse is not None:
+            try:
+                pulse_objects = pulse.sink_list() if kind == "sinks" else pulse.source_list()
+                return {pulse_object.name for pulse_object in pulse_objects}
+            except Exception as e:
+                logger.debug(f"pulsectl failed to list {kind}, falling back to pactl: {e}")
+                self._close_pulse()
+
+        snapshot = self._pactl_snapshot()
+        if snapshot is not None:
+            return {entry.get("name") for entry in snapshot.get(kind, [])}
+
+        try:
+            result = _run_pactl("list", "short", kind)
+        except Exception as e:
+            logger.debug(f"pactl failed to list {kind}: {e}")
+            return None
+        if result.returncode != 0:
+            return None
+        # Short listings are tab separated, the name is the second column
+        return {line.split("\t")[1] for line in result.stdout.splitlines() if "\t" in line}
+
+    def _list_sink_inputs(self):
+        """Return (index, properties) for every PulseAudio sink input, or None if they can't be listed."""
+        pulse = self._get_pulse()
+        if pulse is not None:
+            try:
+                return [(sink_input.index, dict(sink_input.proplist)) for sink_input in pulse.sink_input_list()]
+            except Exception as e:
+                logger.debug(f"pulsectl failed to list sink inputs, falling back to pactl: {e}")
+                self._close_pulse()
+
+        snapshot = self._pactl_snapshot()
+        if snapshot is not None:
+            return [(entry.get("index"), entry.get("properties", {})) for entry in snapshot.get("sink_inputs", [])]
+
+        # pactl without JSON output, parse its text listing instead
+        try:
+            result = _run_pactl("list", "sink-inputs")
+        except Exception as e:
+            logger.debug(f"pactl failed to list sink inputs: {e}")
+            return None
+        if result.returncode != 0:
+            return None
+
+        # One pass over the lines, keeping only the properties of each "Sink Input #N" block
+        sink_inputs = []
+        properties = None
+        for line in result.stdout.splitlines():
+            if line.startswith("Sink Input #"):
+                properties = {}
+                sink_inputs.append((int(line[len("Sink Input #"):]), properties))
+            elif properties is not None and " = " in line:
+                property_match = _PACTL_PROPERTY_RE.match(line)
+                if property_match:
+                    properties[property_match.group(1)] = property_match.group(2)
+        return sink_inputs
+
+    def _move_sink_inputs(self, sink_input_indexes, sink_name):
+        """
+        Move sink inputs to the named sink in one round trip where possible.
+        Returns a dict of sink input index to error message for the moves that failed.
+        """
+        pulse = self._get_pulse()
+        if pulse is not None:
+            try:
+                sink_index = pulse.get_sink_by_name(sink_name).index
+                for sink_input_index in sink_input_indexes:
+                    pulse.sink_input_move(sink_input_index, sink_index)
+                return {}
+            except Exception as e:
+                logger.debug(f"pulsectl failed to move sink inputs, falling back to pacmd: {e}")
+                self._close_pulse()
+
+        # The cached snapshot still shows the sink inputs on their old sink
+        self._pactl_snapshot_cache = None
+
+        # pacmd reads any number of commands from stdin, so all streams move with one fork
+        pacmd_errors = _run_pacmd([f"move-sink-input {sink_input_index} {sink_name}" for sink_input_index in sink_input_indexes])
+        if pacmd_errors == []:
+            return {}
+        logger.debug(f"pacmd could not move all sink inputs, falling back to pactl: {pacmd_errors}")
+
+        errors = {}
+        for sink_input_index in sink_input_indexes:
+            result = _run_pactl("move-sink-input", str(sink_input_index), sink_name, capture_stderr=True)
+            if result.returncode != 0:
+                errors[sink_input_index] = result.stderr
+        return errors
+
+    def _load_chromesink_module(self):
+        """Load the null sink behind ChromeSink and remember its module index. Returns an error message, or None on success."""
+        pulse = self._get_pulse()
+        if pulse is not None:
+            try:
+                self._chromesink_module_idx = str(pulse.module_load("module-null-sink", list(CHROMESINK_MODULE_ARGS)))
+                return None
+            except Exception as e:
+                logger.debug(f"pulsectl failed to load ChromeSink, falling back to pactl: {e}")
+                self._close_pulse()
+
+        result = subprocess.run(["pactl", "load-module", "module-null-sink", *CHROMESINK_MODULE_ARGS], capture_output=True, timeout=10)
+        if result.returncode != 0:
+            return result.stderr.decode()
+        self._chromesink_module_idx = result.stdout.decode().strip()
         return None
 
+    def _set_chromesink_default_with_pulsectl(self):
+        """Make ChromeSink the default sink at 100% volume over the pulsectl connection. Returns whether that worked."""
+        pulse = self._get_pulse()
+        if pulse is None:
+            return False
+        try:
+            pulse.sink_default_set("ChromeSink")
+            pulse.volume_set_all_chans(pulse.get_sink_by_name("ChromeSink"), 1.0)
+            return True
+        except Exception as e:
+            logger.debug(f"pulsectl failed to set up ChromeSink as default, falling back to pacmd: {e}")
+            self._close_pulse()
+            return False
+
+    def _unload_audio_modules(self):
+        """Unload any null sink and loopback modules, in one pacmd call where available"""
+        self._chromesink_module_idx = None
+        # Modules that aren't loaded are reported as errors, which is fine here
+        if _run_pacmd(["unload-module module-null-sink", "unload-module module-loopback"]) is None:
+            _run_pactl("unload-module", "module-null-sink")
+            _run_pactl("unload-module", "module-loopback")
+        self._pactl_snapshot_cache = None
+
     def _check_pulseaudio_chromesink_exists(self):
         """Check if ChromeSink already exists in PulseAudio"""
-        try:
-            result = subprocess.run(
-                ["pactl", "list", "short", "sinks"], 
-                capture_output=True, 
-                timeout=5, 
-                text=True
-            )
-            if result.returncode == 0:
-                # Check if ChromeSink is in the output
-                return "ChromeSink" in result.stdout
-        except:
-            pass
-        return False
+        if self._chromesink_module_idx is not None:
+            return True
+        sink_names = self._list_pulse_names("sinks")
+        return bool(sink_names) and "ChromeSink" in sink_names
+
+    @functools.cached_property
+    def _pulse_env(self):
+        """PulseAudio environment for child processes, matching Google Meet's audio format and reducing jitter"""
+        xdg_runtime_dir = f"/run/user/{os.getuid()}"
+        pulse_runtime_dir = f"{xdg_runtime_dir}/pulse"
+        return {
+            'XDG_RUNTIME_DIR': xdg_runtime_dir,
+            'PULSE_RUNTIME_PATH': pulse_runtime_dir,
+            'PULSE_RUNTIME_DIR': pulse_runtime_dir,
+            'PULSE_SERVER': f"unix:{pulse_runtime_dir}/native",
+            'PULSE_SINK': 'ChromeSink',  # Force new clients to use ChromeSink
+            'PULSE_LATENCY_MSEC': '60',  # Low latency for real-time audio
+        }
 
     def export_pulse_env_for_children(self):
         """
@@ -138,29 +787,16 @@ class ScreenAndAudioRecorder:
         Call this BEFORE starting any audio processes to ensure proper routing.
         """
         try:
-            uid = os.getuid()
-            xdg_runtime_dir = f"/run/user/{uid}"
-            pulse_runtime_dir = f"{xdg_runtime_dir}/pulse"
-            pulse_server = f"unix:{pulse_runtime_dir}/native"
-            
-            # Create runtime directories if they don't exist
-            os.makedirs(xdg_runtime_dir, exist_ok=True)
-            os.makedirs(pulse_runtime_dir, exist_ok=True)
-            
-            # Set comprehensive environment variables for child processes
-            # These match Google Meet's audio format and reduce jitter
-            env_vars = {
-                'XDG_RUNTIME_DIR': xdg_runtime_dir,
-                'PULSE_RUNTIME_PATH': pulse_runtime_dir,
-                'PULSE_RUNTIME_DIR': pulse_runtime_dir, 
-                'PULSE_SERVER': pulse_server,
-                'PULSE_SINK': 'ChromeSink',  # Force new clients to use ChromeSink
-                'PULSE_LATENCY_MSEC': '60',  # Low latency for real-time audio
-            }
+            pulse_env = self._pulse_env
             
-            for key, value in env_vars.items():
-                os.environ[key] = value
-                logger.info(f"Set {key}={value}")
+            # Create runtime directories if they don't exist, a live server socket means they do
+            if not os.path.exists(f"{pulse_env['PULSE_RUNTIME_DIR']}/native"):
+                _mkdir_if_absent(pulse_env['XDG_RUNTIME_DIR'])
+                _mkdir_if_absent(pulse_env['PULSE_RUNTIME_DIR'])
+            
+            # Set environment variables for child processes
+            os.environ.update(pulse_env)
+            logger.info("Set PulseAudio environment: %s", pulse_env)
             
             return True
             
@@ -173,44 +809,24 @@ class ScreenAndAudioRecorder:
         Wait for PulseAudio sink and monitor to be created (async process).
         Returns True if both sink and monitor exist, False otherwise.
         """
+        # module-null-sink creates the sink and its monitor before the load returns, and the
+        # module index is dropped whenever PulseAudio may have gone away, so no need to look
+        if sink_name == "ChromeSink" and self._chromesink_module_idx is not None:
+            return True
+
         logger.info(f"Waiting for {sink_name} and {sink_name}.monitor to be available...")
         
-        for attempt in range(tries):
-            try:
-                # Check for sink
-                sink_result = subprocess.run(
-                    ["pactl", "list", "short", "sinks"], 
-                    capture_output=True, text=True, timeout=5
-                )
-                
-                # Check for monitor source
-                source_result = subprocess.run(
-                    ["pactl", "list", "short", "sources"], 
-                    capture_output=True, text=True, timeout=5
-                )
-                
-                if (sink_result.returncode == 0 and source_result.returncode == 0):
-                    sink_exists = sink_name in sink_result.stdout
-                    monitor_exists = f"{sink_name}.monitor" in source_result.stdout
-                    
-                    if sink_exists and monitor_exists:
-                        logger.info(f"Both {sink_name} and {sink_name}.monitor are available")
-                        return True
-                    else:
-                        logger.debug(f"Attempt {attempt + 1}/{tries}: sink={sink_exists}, monitor={monitor_exists}")
-                
-            except Exception as e:
-                logger.debug(f"Attempt {attempt + 1}/{tries} failed: {e}")
-            
-            time.sleep(sleep_s)
+        if self._wait_for_pulse_objects(sink_name=sink_name, source_name=f"{sink_name}.monitor", timeout_sec=tries * sleep_s):
+            logger.info(f"Both {sink_name} and {sink_name}.monitor are available")
+            return True
         
         # If we get here, log diagnostic info
-        logger.error(f"Failed to find {sink_name} after {tries} attempts")
+        logger.error(f"Failed to find {sink_name} after {tries * sleep_s:.1f} seconds")
         try:
-            info_result = subprocess.run(["pactl", "info"], capture_output=True, text=True, timeout=5)
+            info_result = _run_pactl("info")
             logger.error(f"PulseAudio info: {info_result.stdout}")
             
-            sinks_result = subprocess.run(["pactl", "list", "sinks"], capture_output=True, text=True, timeout=5)
+            sinks_result = _run_pactl("list", "sinks")
             logger.error(f"Available sinks: {sinks_result.stdout}")
         except:
             pass
@@ -218,18 +834,110 @@ class ScreenAndAudioRecorder:
         return False
 
     def _wait_for_chromesink_monitor(self, timeout_sec=5):
-        """Poll PulseAudio for ChromeSink.monitor to exist."""
-        end = time.time() + timeout_sec
-        while time.time() < end:
+        """Wait for ChromeSink.monitor to exist in PulseAudio."""
+        return self._wait_for_pulse_objects(source_name="ChromeSink.monitor", timeout_sec=timeout_sec)
+
+    def _pulse_objects_exist(self, sink_name=None, source_name=None):
+        """Whether the named sink and source (either may be None) both exist"""
+        if sink_name is not None:
+            sink_names = self._list_pulse_names("sinks")
+            if not sink_names or sink_name not in sink_names:
+                return False
+        if source_name is not None:
+            source_names = self._list_pulse_names("sources")
+            if not source_names or source_name not in source_names:
+                return False
+        return True
+
+    def _wait_for_pulse_objects(self, sink_name=None, source_name=None, timeout_sec=5):
+        """Wait up to timeout_sec for the named sink and/or source to exist"""
+        return self._wait_for_pulse_event(("sink", "source"), ("new",), lambda: self._pulse_objects_exist(sink_name, source_name), timeout_sec)
+
+    def _wait_for_pulse_event(self, facilities, event_types, condition, timeout_sec):
+        """
+        Wait up to timeout_sec for condition() to hold. Rather than polling, it is rechecked when
+        PulseAudio reports one of event_types on one of facilities (through pulsectl, or
+        `pactl subscribe` without it), and at least every PULSE_EVENT_RECHECK_SECONDS in case an
+        event was missed. With condition None, returns True on the first such event.
+        """
+        deadline = time.monotonic() + timeout_sec
+        if condition is not None and condition():
+            return True
+
+        pulse = self._get_pulse()
+        if pulse is not None:
             try:
-                result = subprocess.run(["pactl", "list", "short", "sources"],
-                                        capture_output=True, timeout=3, text=True)
-                if result.returncode == 0 and "ChromeSink.monitor" in result.stdout:
+                return self._wait_for_pulse_event_with_pulsectl(pulse, facilities, event_types, condition, deadline)
+            except Exception as e:
+                logger.debug(f"pulsectl event subscription failed, falling back to pactl: {e}")
+                self._close_pulse()
+
+        # pactl names facilities with dashes, e.g. "Event 'new' on sink-input #12"
+        event_re = re.compile(
+            f"Event '(?:{'|'.join(event_types)})' on (?:{'|'.join(facility.replace('_', '-') for facility in facilities)}) #".encode()
+        )
+        try:
+            subscribe_proc = subprocess.Popen(["pactl", "subscribe"], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            logger.debug(f"Could not subscribe to PulseAudio events: {e}")
+            subscribe_proc = None
+
+        try:
+            last_check = time.monotonic()
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_sec = remaining if condition is None else min(remaining, last_check + PULSE_EVENT_RECHECK_SECONDS - time.monotonic())
+                if subscribe_proc is None:
+                    time.sleep(max(wait_sec, 0))
+                elif wait_sec > 0 and select.select([subscribe_proc.stdout], [], [], wait_sec)[0]:
+                    events = os.read(subscribe_proc.stdout.fileno(), 4096)
+                    if not events:
+                        # pactl subscribe exited, keep going on the periodic recheck alone
+                        subscribe_proc.wait()
+                        subscribe_proc = None
+                    elif event_re.search(events):
+                        # Something changed, the cached snapshot can't be trusted anymore
+                        self._pactl_snapshot_cache = None
+                        if condition is None:
+                            return True
+                    else:
+                        continue
+                last_check = time.monotonic()
+                if condition is not None and condition():
                     return True
-            except Exception:
-                pass
-            time.sleep(0.25)
-        return False
+        finally:
+            if subscribe_proc is not None:
+                subscribe_proc.kill()
+                subscribe_proc.wait()
+
+    def _wait_for_pulse_event_with_pulsectl(self, pulse, facilities, event_types, condition, deadline):
+        pulsectl = _pulsectl_module()
+        wanted_types = [getattr(pulsectl.PulseEventTypeEnum, event_type) for event_type in event_types]
+        events_seen = []
+
+        def on_event(event):
+            if event.t in wanted_types:
+                events_seen.append(event)
+                raise pulsectl.PulseLoopStop
+
+        pulse.event_mask_set(*facilities)
+        pulse.event_callback_set(on_event)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                pulse.event_listen(timeout=remaining if condition is None else min(remaining, PULSE_EVENT_RECHECK_SECONDS))
+                if condition is None:
+                    if events_seen:
+                        return True
+                elif condition():
+                    return True
+        finally:
+            pulse.event_callback_set(None)
+            pulse.event_mask_set("null")
 
     def move_chrome_audio_to_chromesink(self, poll_iterations=20, poll_delay=0.5):
         """
@@ -240,97 +948,60 @@ class ScreenAndAudioRecorder:
             logger.info(f"Attempting to move Chrome audio streams to ChromeSink (polling {poll_iterations} times)")
             
             moved_count = 0
+            moved_ids = set()
             for attempt in range(poll_iterations):
-                # Get current sink inputs
-                short_result = subprocess.run(["pactl", "list", "short", "sink-inputs"], 
-                                            capture_output=True, text=True, timeout=5)
+                # Get current sink inputs with their properties
+                sink_inputs = self._list_sink_inputs()
                 
-                if short_result.returncode != 0:
+                if sink_inputs is None:
                     logger.debug(f"Attempt {attempt + 1}: Failed to list sink inputs")
-                    time.sleep(poll_delay)
+                    self._wait_for_new_sink_input(poll_delay)
                     continue
                     
-                if not short_result.stdout.strip():
+                if not sink_inputs:
                     logger.debug(f"Attempt {attempt + 1}: No active sink inputs found")
-                    time.sleep(poll_delay)
-                    continue
-                
-                # Look for Chrome in the short list first (faster)
-                chrome_found_in_short = False
-                for line in short_result.stdout.strip().split('\n'):
-                    if line.strip() and any(chrome_word in line.lower() for chrome_word in ['chrome', 'chromium']):
-                        chrome_found_in_short = True
-                        break
-                
-                if not chrome_found_in_short:
-                    logger.debug(f"Attempt {attempt + 1}: No Chrome sink inputs in short list")
-                    time.sleep(poll_delay)
+                    self._wait_for_new_sink_input(poll_delay)
                     continue
                 
-                # Get detailed sink inputs with properties
-                result = subprocess.run(["pactl", "list", "sink-inputs"], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode != 0:
-                    logger.debug(f"Attempt {attempt + 1}: Failed to get detailed sink input list")
-                    time.sleep(poll_delay)
-                    continue
+                chrome_sink_input_ids = []
                 
-                # Split by sink input blocks and process each
-                blocks = re.split(r"\n(?=Sink Input #\d+)", result.stdout)
-                attempt_moved = 0
-                
-                for block in blocks:
-                    # Extract sink input ID
-                    id_match = re.search(r"Sink Input #(\d+)", block)
-                    if not id_match:
+                for sink_input_id, properties in sink_inputs:
+                    if sink_input_id in moved_ids or not self._is_chrome_sink_input(properties):
                         continue
-                        
-                    sink_input_id = id_match.group(1)
+
+                    logger.info(f"Found Chrome sink input #{sink_input_id}, moving to ChromeSink")
                     
-                    # Enhanced Chrome detection patterns
-                    chrome_indicators = [
-                        'application.name = "Google Chrome"',
-                        'application.name = "Chromium"',
-                        'application.name = "Chrome"',
-                        'application.name = "chrome"',
-                        'application.name = "chromium"',
-                        'application.process.binary = "chrome"',
-                        'application.process.binary = "chromium"',
-                        'application.process.binary = "google-chrome"',
-                        'media.role = "phone"',  # WebRTC audio often has this role
-                    ]
+                    # Log some details about this sink input
+                    for key in CHROME_SINK_INPUT_PROPERTIES:
+                        if key in properties:
+                            logger.info(f'  {key} = "{properties[key]}"')
                     
-                    if any(indicator in block for indicator in chrome_indicators):
-                        logger.info(f"Found Chrome sink input #{sink_input_id}, moving to ChromeSink")
-                        
-                        # Log some details about this sink input
-                        for line in block.split('\n')[:10]:
-                            if any(key in line for key in ['application.name', 'application.process.binary', 'media.role']):
-                                logger.info(f"  {line.strip()}")
-                        
-                        move_result = subprocess.run(
-                            ["pactl", "move-sink-input", sink_input_id, "ChromeSink"], 
-                            capture_output=True, timeout=5
-                        )
-                        
-                        if move_result.returncode == 0:
-                            attempt_moved += 1
-                            moved_count += 1
-                            logger.info(f"✓ Successfully moved Chrome sink input #{sink_input_id} to ChromeSink")
-                        else:
-                            logger.warning(f"✗ Failed to move sink input #{sink_input_id}: {move_result.stderr.decode()}")
+                    chrome_sink_input_ids.append(sink_input_id)
+                
+                attempt_moved = 0
+                move_errors = self._move_sink_inputs(chrome_sink_input_ids, "ChromeSink") if chrome_sink_input_ids else {}
+                
+                for sink_input_id in chrome_sink_input_ids:
+                    if sink_input_id in move_errors:
+                        logger.warning(f"✗ Failed to move sink input #{sink_input_id}: {move_errors[sink_input_id]}")
+                    else:
+                        attempt_moved += 1
+                        moved_count += 1
+                        moved_ids.add(sink_input_id)
+                        logger.info(f"✓ Successfully moved Chrome sink input #{sink_input_id} to ChromeSink")
                 
                 if attempt_moved > 0:
                     logger.info(f"Moved {attempt_moved} Chrome streams in attempt {attempt + 1}")
-                    # Give a moment for audio to start flowing, then check if we have more
-                    time.sleep(0.5)
-                    
-                    # If we moved something, continue polling a bit more to catch any new streams
+                
+                if moved_count > 0:
+                    # Keep going only while Chrome keeps opening new streams
+                    if not self._wait_for_new_sink_input(poll_delay):
+                        break
                     continue
                 
                 # No Chrome streams found this attempt
                 logger.debug(f"Attempt {attempt + 1}: No Chrome audio streams found to move")
-                time.sleep(poll_delay)
+                self._wait_for_new_sink_input(poll_delay)
             
             if moved_count > 0:
                 logger.info(f"✓ Total: Moved {moved_count} Chrome audio streams to ChromeSink")
@@ -348,13 +1019,55 @@ class ScreenAndAudioRecorder:
             logger.warning(f"Failed to move Chrome audio to ChromeSink: {e}")
             return False
 
+    def _wait_for_new_sink_input(self, timeout_sec):
+        """Wait up to timeout_sec for a client such as Chrome to open a new playback stream. Returns whether one did."""
+        return self._wait_for_pulse_event(("sink_input",), ("new",), None, timeout_sec)
+
+    @staticmethod
+    def _is_chrome_sink_input(properties):
+        """Whether a sink input's properties identify it as Chrome's audio"""
+        return any(properties.get(key) in values for key, values in CHROME_SINK_INPUT_PROPERTIES.items())
+
+    def _read_monitor_peak(self, reads=1, on_open=None):
+        """
+        Peak sample magnitude of up to `reads` 100ms reads straight from ChromeSink.monitor through
+        the PulseAudio simple API, stopping at the first one above MONITOR_SILENCE_PEAK. on_open is called once the
+        monitor is being recorded. Returns None if pasimple can't be loaded or the read failed.
+        """
+        pasimple = _pasimple_module()
+        if pasimple is None:
+            return None
+        try:
+            import numpy as np
+
+            peak = 0
+            with pasimple.PaSimple(pasimple.PA_STREAM_RECORD, pasimple.PA_SAMPLE_S16LE, 1, 48000,
+                                   app_name="attendee-monitor-probe", device_name="ChromeSink.monitor") as stream:
+                if on_open is not None:
+                    on_open()
+                for _ in range(reads):
+                    samples = np.frombuffer(stream.read(MONITOR_PEAK_READ_BYTES), dtype=np.int16).astype(np.int32)
+                    peak = max(peak, int(np.abs(samples).max(initial=0)))
+                    if peak > MONITOR_SILENCE_PEAK:
+                        break
+        except Exception as e:
+            logger.debug(f"Direct ChromeSink.monitor read failed, falling back to ffmpeg: {e}")
+            return None
+        return peak
+
     def monitor_has_signal(self, timeout_sec=3):
         """Check if ChromeSink.monitor has actual audio signal (not just silence)."""
         try:
             logger.debug("Probing ChromeSink.monitor for audio signal")
             
+            # Listen for up to timeout_sec, a single short read could land in a pause in speech
+            peak = self._read_monitor_peak(reads=max(1, int(timeout_sec * 10)))
+            if peak is not None:
+                logger.debug(f"ChromeSink.monitor peak sample: {peak}")
+                return peak > MONITOR_SILENCE_PEAK
+            
             # Quick ffmpeg probe with volumedetect
-            cmd = ["ffmpeg", "-hide_banner", "-nostats", "-y", 
+            cmd = [_ffmpeg_path(), "-hide_banner", "-nostats", "-y", 
                    "-f", "pulse", "-i", "ChromeSink.monitor",
                    "-t", "1.5", "-vn", "-af", "volumedetect", 
                    "-f", "null", "-"]
@@ -376,7 +1089,7 @@ class ScreenAndAudioRecorder:
                     return False
                 else:
                     # Extract the actual volume value for logging
-                    volume_match = re.search(r"max_volume:\s*([-\d.]+)\s*dB", result.stderr)
+                    volume_match = _VOLUME_RE.search(result.stderr)
                     if volume_match:
                         volume = volume_match.group(1)
                         logger.debug(f"ChromeSink.monitor has audio signal (max_volume: {volume} dB)")
@@ -455,11 +1168,8 @@ class ScreenAndAudioRecorder:
                 
             # Try to move Chrome's audio streams (with built-in polling)
             if self.move_chrome_audio_to_chromesink(poll_iterations=20, poll_delay=0.5):
-                # Wait a moment for audio to start flowing
-                time.sleep(1)
-                
-                # Check if we now have signal
-                if self.monitor_has_signal(timeout_sec=2):
+                # Check for signal as soon as the moved streams settle rather than after a fixed wait
+                if self._wait_for_pulse_event(("sink_input",), ("new", "change"), lambda: self.monitor_has_signal(timeout_sec=2), timeout_sec=1):
                     logger.info("✓ Successfully routed Chrome audio to ChromeSink")
                     return True
                 else:
@@ -467,10 +1177,10 @@ class ScreenAndAudioRecorder:
             else:
                 logger.warning(f"Could not find/move Chrome audio streams (attempt {attempt + 1})")
             
-            # Wait before next attempt
+            # Wait before next attempt, cut short when Chrome opens a new stream
             if attempt < retry_count - 1:
                 logger.info("Waiting before next attempt...")
-                time.sleep(2)
+                self._wait_for_new_sink_input(2)
         
         logger.error("✗ Could not ensure Chrome audio is routed to ChromeSink after all attempts")
         # Run diagnostics to help user understand what went wrong
@@ -505,12 +1215,16 @@ class ScreenAndAudioRecorder:
         """
         Comprehensive diagnostics for Chrome audio routing issues.
         Call this when Chrome audio streams are not found.
+        The report is logged at INFO, so nothing is queried when that level is disabled.
         """
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         logger.info("=== Chrome Audio Routing Diagnostics ===")
         
         try:
             # 1. Check PulseAudio status
-            result = subprocess.run(["pactl", "info"], capture_output=True, text=True, timeout=5)
+            result = _run_pactl("info")
             if result.returncode == 0:
                 logger.info("✓ PulseAudio is running")
             else:
@@ -518,91 +1232,38 @@ class ScreenAndAudioRecorder:
                 return
             
             # 2. Check ChromeSink exists
-            sinks = subprocess.run(["pactl", "list", "short", "sinks"], capture_output=True, text=True, timeout=5)
-            if sinks.returncode == 0:
-                chromesink_found = "ChromeSink" in sinks.stdout
+            sink_names = self._list_pulse_names("sinks")
+            if sink_names is not None:
+                chromesink_found = "ChromeSink" in sink_names
                 logger.info(f"{'✓' if chromesink_found else '✗'} ChromeSink exists: {chromesink_found}")
-                if chromesink_found:
-                    for line in sinks.stdout.strip().split('\n'):
-                        if 'ChromeSink' in line:
-                            logger.info(f"  ChromeSink: {line}")
-                else:
+                if not chromesink_found:
                     logger.info("Available sinks:")
-                    for line in sinks.stdout.strip().split('\n'):
-                        logger.info(f"  {line}")
+                    for name in sorted(sink_names):
+                        logger.info(f"  {name}")
             
             # 3. Check ChromeSink.monitor exists
-            sources = subprocess.run(["pactl", "list", "short", "sources"], capture_output=True, text=True, timeout=5)
-            if sources.returncode == 0:
-                monitor_found = "ChromeSink.monitor" in sources.stdout
+            source_names = self._list_pulse_names("sources")
+            if source_names is not None:
+                monitor_found = "ChromeSink.monitor" in source_names
                 logger.info(f"{'✓' if monitor_found else '✗'} ChromeSink.monitor exists: {monitor_found}")
-                if monitor_found:
-                    for line in sources.stdout.strip().split('\n'):
-                        if 'ChromeSink.monitor' in line:
-                            logger.info(f"  Monitor: {line}")
-            
-            # 4. Check active sink inputs (Chrome streams) with JSON format for better parsing
-            logger.info("Checking Chrome sink inputs with detailed JSON output...")
-            sink_inputs = subprocess.run(["pactl", "list", "short", "sink-inputs"], capture_output=True, text=True, timeout=5)
-            if sink_inputs.returncode == 0:
-                chrome_streams = []
-                all_streams = []
-                for line in sink_inputs.stdout.strip().split('\n'):
-                    if line.strip():
-                        all_streams.append(line)
-                        if any(chrome_word in line.lower() for chrome_word in ['chrome', 'chromium']):
-                            chrome_streams.append(line)
-                
+            
+            # 4. Check active sink inputs (Chrome streams)
+            sink_inputs = self._list_sink_inputs()
+            if sink_inputs is not None:
+                chrome_streams = [(sink_input_id, properties) for sink_input_id, properties in sink_inputs if self._is_chrome_sink_input(properties)]
                 logger.info(f"{'✓' if chrome_streams else '✗'} Chrome sink inputs found: {len(chrome_streams)}")
                 if chrome_streams:
-                    for stream in chrome_streams:
-                        logger.info(f"  Chrome stream: {stream}")
+                    for sink_input_id, properties in chrome_streams:
+                        logger.info(f"  Chrome stream #{sink_input_id}: {properties.get('application.name', '')} ({properties.get('application.process.binary', '')})")
                 else:
-                    logger.info(f"All active sink inputs ({len(all_streams)}):")
-                    for stream in all_streams[:10]:  # Limit to first 10
-                        logger.info(f"  {stream}")
-                
-                # Try JSON format for more detailed Chrome detection (newer pactl versions)
-                try:
-                    json_result = subprocess.run(["pactl", "-f", "json", "list", "sink-inputs"], 
-                                               capture_output=True, text=True, timeout=5)
-                    if json_result.returncode == 0:
-                        import json
-                        try:
-                            sink_data = json.loads(json_result.stdout)
-                            chrome_json_streams = []
-                            for sink in sink_data:
-                                props = sink.get('properties', {})
-                                app_name = props.get('application.name', '')
-                                if any(chrome_word in app_name.lower() for chrome_word in ['chrome', 'chromium']):
-                                    chrome_json_streams.append({
-                                        'index': sink.get('index'),
-                                        'app_name': app_name,
-                                        'sink': sink.get('sink'),
-                                        'process_binary': props.get('application.process.binary', ''),
-                                        'media_role': props.get('media.role', '')
-                                    })
-                            
-                            if chrome_json_streams:
-                                logger.info(f"✓ JSON format detected {len(chrome_json_streams)} Chrome streams:")
-                                for stream in chrome_json_streams:
-                                    logger.info(f"  Chrome #{stream['index']}: {stream['app_name']} -> {stream['sink']}")
-                            else:
-                                logger.info("✗ JSON format found no Chrome streams")
-                        except json.JSONDecodeError:
-                            logger.debug("JSON parsing failed for sink inputs")
-                    else:
-                        logger.debug("JSON format not supported by this pactl version")
-                except:
-                    logger.debug("pactl JSON format not available")
+                    logger.info(f"All active sink inputs ({len(sink_inputs)}):")
+                    for sink_input_id, properties in sink_inputs[:10]:  # Limit to first 10
+                        logger.info(f"  #{sink_input_id}: {properties.get('application.name', '')}")
             
             # 5. Check PulseAudio clients
-            clients = subprocess.run(["pactl", "list", "clients"], capture_output=True, text=True, timeout=5)
+            clients = _run_pactl("list", "clients")
             if clients.returncode == 0:
-                chrome_clients = []
-                for line in clients.stdout.split('\n'):
-                    if any(chrome_word in line.lower() for chrome_word in ['chrome', 'chromium']):
-                        chrome_clients.append(line.strip())
+                chrome_clients = [line.strip() for line in clients.stdout.splitlines() if _CHROME_RE.search(line)]
                 
                 logger.info(f"{'✓' if chrome_clients else '✗'} Chrome PulseAudio clients: {len(chrome_clients)}")
                 for client in chrome_clients[:5]:  # Limit output
@@ -655,9 +1316,7 @@ class ScreenAndAudioRecorder:
             logger.info("Detecting Chrome audio format...")
             
             # Get detailed info about ChromeSink.monitor
-            result = subprocess.run([
-                "pactl", "list", "sources"
-            ], capture_output=True, text=True, timeout=5)
+            result = _run_pactl("list", "sources")
             
             if result.returncode != 0:
                 logger.warning("Could not get source information")
@@ -705,8 +1364,13 @@ class ScreenAndAudioRecorder:
             
             # Check file growth
             file_stats = {}
-            if self.file_location and os.path.exists(self.file_location):
-                file_size = os.path.getsize(self.file_location)
+            file_size = None
+            if self.file_location:
+                try:
+                    file_size = os.stat(self.file_location).st_size
+                except FileNotFoundError:
+                    pass
+            if file_size is not None:
                 duration = time.time() - self.recording_started_time if self.recording_started_time else 0
                 file_stats = {
                     "file_size_mb": round(file_size / (1024 * 1024), 2),
@@ -721,9 +1385,7 @@ class ScreenAndAudioRecorder:
                 
                 # Get current volume level
                 try:
-                    vol_result = subprocess.run([
-                        "pactl", "list", "sources"
-                    ], capture_output=True, text=True, timeout=2)
+                    vol_result = _run_pactl("list", "sources", timeout=2)
                     
                     if "ChromeSink.monitor" in vol_result.stdout:
                         # Extract volume info if available
@@ -821,7 +1483,7 @@ class ScreenAndAudioRecorder:
             
             # Use FFmpeg to analyze volume levels
             result = subprocess.run([
-                "ffmpeg", "-hide_banner", "-nostats", "-y",
+                _ffmpeg_path(), "-hide_banner", "-nostats", "-y",
                 "-f", "pulse", "-i", "ChromeSink.monitor",
                 "-t", str(sample_duration), "-vn", 
                 "-af", "volumedetect,astats=metadata=1",
@@ -908,24 +1570,17 @@ class ScreenAndAudioRecorder:
         logger.info("✓ Started PulseAudio daemon")
         
         # 2) Create bulletproof null sink
-        subprocess.run(["pactl", "unload-module", "module-null-sink"], capture_output=True)
-        subprocess.run(["pactl", "unload-module", "module-loopback"], capture_output=True)
-        
-        result = subprocess.run([
-            "pactl", "load-module", "module-null-sink",
-            "sink_name=ChromeSink", 
-            "sink_properties=device.description=ChromeSink",
-            "rate=48000", "channels=2"
-        ], capture_output=True)
+        self._unload_audio_modules()
         
-        if result.returncode == 0:
-            logger.info("✓ Created bulletproof ChromeSink (48kHz stereo)")
+        load_error = self._load_chromesink_module()
+        if load_error is None:
+            logger.info(f"✓ Created bulletproof ChromeSink (48kHz stereo, module #{self._chromesink_module_idx})")
         else:
-            logger.error(f"✗ Failed to create ChromeSink: {result.stderr.decode()}")
+            logger.error(f"✗ Failed to create ChromeSink: {load_error}")
             return False
         
         # Set as default
-        subprocess.run(["pactl", "set-default-sink", "ChromeSink"], capture_output=True)
+        _run_pactl("set-default-sink", "ChromeSink")
         
         # 3) Verify setup including ALSA bridge
         time.sleep(1)
@@ -1022,7 +1677,7 @@ class ScreenAndAudioRecorder:
         
         try:
             # 1. Check PulseAudio status
-            pulse_info = subprocess.run(["pactl", "info"], capture_output=True, text=True, timeout=3)
+            pulse_info = _run_pactl("info", timeout=3)
             if pulse_info.returncode == 0:
                 logger.info("✓ PulseAudio running")
             else:
@@ -1030,12 +1685,12 @@ class ScreenAndAudioRecorder:
                 return False
             
             # 2. Check ChromeSink exists
-            sinks = subprocess.run(["pactl", "list", "short", "sinks"], capture_output=True, text=True, timeout=3)
+            sinks = _run_pactl("list", "short", "sinks", timeout=3)
             chromesink_exists = "ChromeSink" in sinks.stdout if sinks.returncode == 0 else False
             logger.info(f"{'✓' if chromesink_exists else '✗'} ChromeSink exists")
             
             # 3. Check ChromeSink.monitor exists
-            sources = subprocess.run(["pactl", "list", "short", "sources"], capture_output=True, text=True, timeout=3)
+            sources = _run_pactl("list", "short", "sources", timeout=3)
             monitor_exists = "ChromeSink.monitor" in sources.stdout if sources.returncode == 0 else False
             logger.info(f"{'✓' if monitor_exists else '✗'} ChromeSink.monitor exists")
             
@@ -1129,11 +1784,6 @@ class ScreenAndAudioRecorder:
         try:
             logger.info("Testing Chrome audio setup with test sound")
             
-            # Play a test sound to ChromeSink
-            test_cmd = [
-                "paplay", "--device=ChromeSink", "/usr/share/sounds/alsa/Front_Center.wav"
-            ]
-            
             # Try to find a test sound file
             test_files = [
                 "/usr/share/sounds/alsa/Front_Center.wav",
@@ -1150,27 +1800,35 @@ class ScreenAndAudioRecorder:
             if not test_file:
                 logger.warning("No test sound file found, generating tone")
                 # Generate a test tone using speaker-test
-                result = subprocess.run([
-                    "timeout", "2", "speaker-test", "-t", "sine", "-f", "1000", "-l", "1", "-D", "ChromeSink"
-                ], capture_output=True, timeout=5)
-                if result.returncode == 0:
-                    logger.info("✓ Generated test tone to ChromeSink")
-                else:
-                    logger.warning("Could not generate test tone")
-                    return False
+                player_cmd = ["timeout", "2", "speaker-test", "-t", "sine", "-f", "1000", "-l", "1", "-D", "ChromeSink"]
             else:
-                result = subprocess.run([
-                    "paplay", "--device=ChromeSink", test_file
-                ], timeout=5)
-                if result.returncode == 0:
-                    logger.info(f"✓ Played test sound to ChromeSink: {test_file}")
-                else:
-                    logger.warning(f"Could not play test sound: {test_file}")
-                    return False
+                player_cmd = ["paplay", "--device=ChromeSink", test_file]
             
-            # Quick check if we can record from ChromeSink.monitor
-            time.sleep(0.5)  # Let the sound settle
-            if self.monitor_has_signal(timeout_sec=2):
+            # Listen on ChromeSink.monitor while the sound plays, rather than after it finished
+            players = []
+            
+            def start_player():
+                players.append(subprocess.Popen(player_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+            
+            peak = self._read_monitor_peak(reads=10, on_open=start_player)
+            if peak is not None:
+                signal_found = peak > MONITOR_SILENCE_PEAK
+            else:
+                if not players:
+                    start_player()
+                signal_found = self.monitor_has_signal(timeout_sec=2)
+            
+            try:
+                player_returncode = players[0].wait(timeout=5) if players else None
+            except subprocess.TimeoutExpired:
+                players[0].kill()
+                player_returncode = players[0].wait()
+            if player_returncode != 0 and not signal_found:
+                logger.warning(f"Could not play test sound to ChromeSink: {' '.join(player_cmd)}")
+                return False
+            logger.info(f"✓ Played test sound to ChromeSink: {test_file or 'sine tone'}")
+            
+            if signal_found:
                 logger.info("✓ ChromeSink.monitor has audio signal - setup working!")
                 return True
             else:
@@ -1181,45 +1839,98 @@ class ScreenAndAudioRecorder:
             logger.warning(f"Audio setup test failed: {e}")
             return False
     
-    def _test_audio_input(self, audio_cmd, description):
-        """Test if a specific audio input configuration works"""
+    def _check_audio_device(self, audio_cmd):
+        """
+        Cheaply check whether the device an audio input configuration points at exists,
+        without spawning ffmpeg. Returns True/False when that can be decided, None otherwise.
+        """
+        input_format = audio_cmd[audio_cmd.index("-f") + 1] if "-f" in audio_cmd else None
+        device = audio_cmd[audio_cmd.index("-i") + 1] if "-i" in audio_cmd else None
+
+        if input_format == "lavfi":
+            return True
+
+        if input_format == "alsa":
+            hw_match = _ALSA_HW_DEVICE_RE.fullmatch(device or "")
+            if hw_match:
+                card, pcm = hw_match.group(1), hw_match.group(2) or "0"
+                return os.path.exists(f"/dev/snd/pcmC{card}D{pcm}c")
+            if device == "default":
+                try:
+                    with open('/proc/asound/cards', 'r') as f:
+                        if "no soundcards" not in f.read() and os.path.exists('/dev/snd'):
+                            return True
+                except OSError:
+                    pass
+                # Without a real card, default only works when ALSA is bridged to PulseAudio
+                for path in ('/etc/asound.conf', os.path.expanduser('~/.asoundrc')):
+                    try:
+                        with open(path, 'r') as f:
+                            if 'type pulse' in f.read():
+                                return self._pulse_server_available() or None
+                    except OSError:
+                        pass
+                return False
+            return None
+
+        if input_format == "pulse":
+            try:
+                result = _run_pactl("list", "short", "sources", timeout=3)
+            except Exception:
+                return None
+            if result.returncode != 0:
+                return False
+            return device == "default" or device in result.stdout
+
+        return None
+
+    def _test_audio_input(self, audio_cmd, description, probe_procs=None):
+        """
+        Test if a specific audio input configuration works.
+        If probe_procs (a _ProbeProcesses) is given, the probe's ffmpeg process is added to it so a
+        caller running several probes concurrently can kill the ones it no longer needs.
+        """
+        # Answer from the device itself when possible, opening it with ffmpeg takes a second or more
+        device_available = self._check_audio_device(audio_cmd)
+        if device_available is not None:
+            logger.debug(f"Audio device check for {description}: {'available' if device_available else 'not available'}")
+            return device_available
+
         try:
             # Create a quick test command to check if audio input works
-            test_cmd = ["ffmpeg", "-y"] + audio_cmd + ["-t", "1.0", "-f", "null", "-"]
+            test_cmd = [_ffmpeg_path(), "-hide_banner", "-nostdin", "-loglevel", "error", "-y", *audio_cmd, "-t", "1.0", "-f", "null", "-"]
             
             # Run the test command with a short timeout
-            result = subprocess.run(
+            proc = subprocess.Popen(
                 test_cmd, 
+                stdin=subprocess.DEVNULL,  # Probes run concurrently, keep them off our stdin
                 stdout=subprocess.DEVNULL, 
                 stderr=subprocess.PIPE, 
-                timeout=5,  # Increased timeout for more thorough testing
                 text=True
             )
+            if probe_procs is not None and not probe_procs.add(proc):
+                # The caller no longer needs this probe, it was killed as it was added
+                proc.communicate()
+                return False
+            try:
+                _, stderr = proc.communicate(timeout=5)  # Increased timeout for more thorough testing
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
             
             # Check if the command succeeded (exit code 0) and didn't have critical errors
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 return True
             
-            # Check stderr for specific error patterns that indicate failures
-            stderr_output = result.stderr.lower()
-            
-            # These are definitive failure patterns
-            failure_patterns = [
-                "input/output error",
-                "no such file or directory", 
-                "no such process",
-                "cannot open audio device",
-                "connection refused",
-                "permission denied"
-            ]
-            
-            if any(pattern in stderr_output for pattern in failure_patterns):
-                logger.debug(f"Audio test failed for {description}: {stderr_output[:200]}")
+            # Check stderr for definitive failure patterns
+            if _AUDIO_PROBE_FAILURE_RE.search(stderr):
+                logger.debug(f"Audio test failed for {description}: {stderr[:200]}")
                 return False
                 
             # For non-zero exit codes, be more conservative
-            if result.returncode != 0:
-                logger.debug(f"Audio test returned non-zero exit code {result.returncode} for {description}")
+            if proc.returncode != 0:
+                logger.debug(f"Audio test returned non-zero exit code {proc.returncode} for {description}")
                 return False
                 
             # If we get here, it might be recoverable
@@ -1239,8 +1950,7 @@ class ScreenAndAudioRecorder:
         """
         try:
             # Check if PulseAudio is available
-            result = subprocess.run(["pactl", "info"], capture_output=True, timeout=5)
-            if result.returncode != 0:
+            if not self._pulse_running():
                 logger.info("PulseAudio not available, skipping meeting audio setup")
                 return False
                 
@@ -1248,8 +1958,7 @@ class ScreenAndAudioRecorder:
             
             # Clean up any existing modules first to avoid conflicts
             logger.info("Cleaning up existing audio modules")
-            subprocess.run(["pactl", "unload-module", "module-null-sink"], capture_output=True, timeout=5)
-            subprocess.run(["pactl", "unload-module", "module-loopback"], capture_output=True, timeout=5)
+            self._unload_audio_modules()
             
             # Check if ChromeSink already exists after cleanup
             if self._check_pulseaudio_chromesink_exists():
@@ -1265,34 +1974,31 @@ class ScreenAndAudioRecorder:
             # Create null sink with explicit 48k stereo format (matches Meet)
             # This prevents format/clock drift that causes white noise
             logger.info("Creating null sink with 48kHz stereo format")
-            result = subprocess.run([
-                "pactl", "load-module", "module-null-sink",
-                "sink_name=ChromeSink",
-                "sink_properties=device.description=ChromeSink",
-                "rate=48000",
-                "channels=2"
-            ], capture_output=True, timeout=10)
-            
-            if result.returncode != 0:
-                logger.error(f"Failed to create ChromeSink: {result.stderr.decode()}")
+            load_error = self._load_chromesink_module()
+            if load_error is not None:
+                logger.error(f"Failed to create ChromeSink: {load_error}")
                 return False
             
-            logger.info("✓ Created ChromeSink null sink (48kHz stereo, zero jitter)")
-            
-            # Set ChromeSink as default output (so Chrome uses it)
-            subprocess.run([
-                "pactl", "set-default-sink", "ChromeSink"
-            ], check=True, timeout=10)
-            logger.info("✓ Set ChromeSink as default audio output")
+            logger.info(f"✓ Created ChromeSink null sink (48kHz stereo, zero jitter, module #{self._chromesink_module_idx})")
             
-            # Set reasonable volume level
-            try:
+            # Set ChromeSink as default output (so Chrome uses it) at a reasonable volume level,
+            # over the pulsectl connection or else one pacmd connection (65536 is 100% in pacmd's raw volume units)
+            if self._set_chromesink_default_with_pulsectl() or _run_pacmd(["set-default-sink ChromeSink", "set-sink-volume ChromeSink 65536"], timeout=10) == []:
+                logger.info("✓ Set ChromeSink as default audio output")
+                logger.info("✓ Set ChromeSink volume to 100%")
+            else:
                 subprocess.run([
-                    "pactl", "set-sink-volume", "ChromeSink", "100%"
+                    "pactl", "set-default-sink", "ChromeSink"
                 ], check=True, timeout=10)
-                logger.info("✓ Set ChromeSink volume to 100%")
-            except subprocess.CalledProcessError:
-                logger.warning("Could not set sink volume")
+                logger.info("✓ Set ChromeSink as default audio output")
+                
+                try:
+                    subprocess.run([
+                        "pactl", "set-sink-volume", "ChromeSink", "100%"
+                    ], check=True, timeout=10)
+                    logger.info("✓ Set ChromeSink volume to 100%")
+                except subprocess.CalledProcessError:
+                    logger.warning("Could not set sink volume")
             
             # Wait for sink and monitor to be properly registered
             if self.ensure_sink_and_monitor_exist():
@@ -1312,33 +2018,45 @@ class ScreenAndAudioRecorder:
             logger.warning(f"Error setting up PulseAudio: {e}")
             return False
 
+    def _pulse_running(self):
+        """Whether the PulseAudio server answers `pactl info`, trusting a recent answer for PULSE_INFO_TTL_SECONDS"""
+        if self._pulse_ready_at is not None and time.monotonic() - self._pulse_ready_at < PULSE_INFO_TTL_SECONDS:
+            return True
+        if _run_pactl("info").returncode != 0:
+            self._pulse_ready_at = None
+            return False
+        self._pulse_ready_at = time.monotonic()
+        return True
+
     def start_pulseaudio_if_needed(self):
         """Start PulseAudio daemon if not already running with optimized settings"""
         try:
             # Check if PulseAudio is already running
-            result = subprocess.run(["pactl", "info"], capture_output=True, timeout=5)
-            if result.returncode == 0:
+            if self._pulse_running():
                 logger.info("PulseAudio is already running")
                 return True
                 
             logger.info("Starting PulseAudio daemon with basic settings")
+            self._chromesink_module_idx = None
             # Start PulseAudio in daemon mode with basic settings for maximum compatibility
             subprocess.run([
                 "pulseaudio", "-D", 
                 "--exit-idle-time=-1"   # Never exit - this is the only widely supported option
             ], check=True, timeout=10)
             
-            # Wait a moment for it to start
-            time.sleep(2)
-            
-            # Verify it's running
-            result = subprocess.run(["pactl", "info"], capture_output=True, timeout=5)
-            if result.returncode == 0:
-                logger.info("PulseAudio started successfully with basic settings")
-                return True
-            else:
-                logger.warning("PulseAudio failed to start properly")
-                return False
+            # Poll until it answers, backing off, rather than always waiting the full timeout
+            deadline = time.monotonic() + PULSE_START_TIMEOUT_SECONDS
+            delay = PULSE_START_POLL_INITIAL_SECONDS
+            while not self._pulse_running():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("PulseAudio failed to start properly")
+                    return False
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, PULSE_START_POLL_MAX_SECONDS)
+
+            logger.info("PulseAudio started successfully with basic settings")
+            return True
                 
         except subprocess.CalledProcessError as e:
             logger.warning(f"Failed to start PulseAudio: {e}")
@@ -1347,10 +2065,71 @@ class ScreenAndAudioRecorder:
             logger.warning(f"Error starting PulseAudio: {e}")
             return False
 
+    def _get_video_encoding_options(self):
+        """
+        Return (global_options, encode_options) for the video stream.
+        Uses a hardware encoder when ENABLE_HW_ENCODE is set and one is available, libx264 otherwise.
+
+        Capture always stays on x11grab: the meeting is rendered into an Xvfb virtual display,
+        which has no KMS plane, so kmsgrab would capture the host console rather than the meeting.
+        """
+        hw_encoder = _detect_hw_encoder() if _envbool('ENABLE_HW_ENCODE') else None
+
+        if hw_encoder == "h264_vaapi":
+            logger.info(f"Using VAAPI hardware encoder on {VAAPI_RENDER_DEVICE}")
+            return (
+                ["-vaapi_device", VAAPI_RENDER_DEVICE],
+                ["-vf", "format=nv12,hwupload", "-c:v", "h264_vaapi", "-g", "30"],
+            )
+        if hw_encoder == "h264_nvenc":
+            logger.info("Using NVENC hardware encoder")
+            return (
+                [],
+                ["-c:v", "h264_nvenc", "-preset", "p1", "-pix_fmt", "yuv420p", "-g", "30"],
+            )
+        # Pin encoder threads so x264 doesn't spawn one per core and starve Chrome on big hosts
+        encode_threads = str(int(os.environ.get('FFMPEG_ENCODE_THREADS') or self.ffmpeg_thread_count))
+        return (
+            ["-filter_threads", "1"],
+            [
+                "-c:v", "libx264", "-preset", "ultrafast", "-tune", "zerolatency", "-pix_fmt", "yuv420p", "-g", "30",
+                "-threads", encode_threads, "-x264-params", "sliced-threads=1:lookahead-threads=1:sync-lookahead=0:rc-lookahead=0",
+            ],
+        )
+
+    def _get_x11grab_input(self, display_var):
+        """x11grab input for just the recording area, offset into the screen buffer"""
+        return f"{display_var}+{self.capture_offset[0]},{self.capture_offset[1]}"
+
+    def _get_video_input_options(self, display_var):
+        """FFmpeg input options for capturing the recording area of the display"""
+        return [
+            "-thread_queue_size", str(self.thread_queue_size),
+            "-framerate", "30",
+            "-video_size", f"{self.recording_dimensions[0]}x{self.recording_dimensions[1]}",
+            "-f", "x11grab", "-draw_mouse", "0", "-probesize", "500k", *LOW_LATENCY_INPUT_OPTIONS, "-i", self._get_x11grab_input(display_var),
+        ]
+
+    def _get_audio_input_prefix(self):
+        """FFmpeg input options that go in front of the audio input options"""
+        return ["-thread_queue_size", str(self.thread_queue_size), "-probesize", "32", *LOW_LATENCY_INPUT_OPTIONS]
+
+    @staticmethod
+    def _build_ffmpeg_cmd(input_options, output_options, output_path):
+        """Assemble an ffmpeg command line from its input and output options"""
+        return [
+            _ffmpeg_path(),
+            "-hide_banner", "-nostdin", "-loglevel", "error",  # Only log errors, not banners and per-frame progress
+            "-y",  # Overwrite output file without asking
+            *input_options,
+            *output_options,
+            str(output_path),
+        ]
+
     def start_recording(self, display_var):
         logger.info(f"Starting screen recorder for display {display_var} with dimensions {self.screen_dimensions} and file location {self.file_location}")
         
-        # Create a log file for ffmpeg output to help with debugging
+        # Log file that ffmpeg's output is written to if the recording fails, to help with debugging
         if self.file_location:
             log_dir = os.path.dirname(self.file_location)
             log_filename = f"ffmpeg_{os.path.basename(self.file_location)}.log"
@@ -1361,44 +2140,45 @@ class ScreenAndAudioRecorder:
             audio_options = self._get_audio_input_options()
             if not audio_options:
                 raise RuntimeError("No audio input available for audio-only recording")
+            if audio_options == list(CHROMESINK_AUDIO_INPUT_OPTIONS):
+                audio_options = list(CHROMESINK_MONO_AUDIO_INPUT_OPTIONS)
                 
             # FFmpeg command for audio-only recording to MP3
-            ffmpeg_cmd = [
-                "ffmpeg",
-                "-y",  # Overwrite output file without asking
-            ] + audio_options + [
-                "-c:a",
-                "libmp3lame",  # MP3 codec
-                "-b:a",
-                "192k",  # Audio bitrate (192 kbps for good quality)
-                "-ar",
-                "44100",  # Sample rate
-                "-ac",
-                "1",  # Mono
+            ffmpeg_cmd = self._build_ffmpeg_cmd(
+                [*self._get_audio_input_prefix(), *audio_options],
+                [
+                    "-c:a", "libmp3lame",  # MP3 codec
+                    "-b:a", "192k",  # Audio bitrate (192 kbps for good quality)
+                    "-ar", "48000",  # Sample rate, the capture rate so nothing is resampled
+                    "-ac", "1",  # Mono
+                ],
                 self.file_location,
-            ]
+            )
             
             # Try to start recording
             self._attempt_recording(ffmpeg_cmd, display_var)
         else:
             # For video recording, try with audio first, then fallback to video-only
-            audio_options = self._get_audio_input_options()
+            if self._audio_failed_fingerprint == self._audio_host_fingerprint() and not _envbool('FORCE_AUDIO_REPROBE'):
+                logger.info("Recording with audio already failed with this audio setup, skipping audio detection")
+                audio_options = None
+            else:
+                audio_options = self._get_audio_input_options()
+            video_global_options, video_encode_options = self._get_video_encoding_options()
+            video_input_options = self._get_video_input_options(display_var)
             
             if audio_options:
                 # Try with audio first - AUDIO INPUT FIRST for better A/V sync
-                ffmpeg_cmd = [
-                    "ffmpeg", "-y",
-                ] + audio_options + [
-                    "-thread_queue_size", "4096", 
-                    "-framerate", "30", 
-                    "-video_size", f"{self.screen_dimensions[0]}x{self.screen_dimensions[1]}", 
-                    "-f", "x11grab", "-draw_mouse", "0", "-probesize", "500k", "-i", display_var,
-                    "-filter:a", "aresample=async=1:min_hard_comp=0.100:first_pts=0,aformat=sample_fmts=s16:sample_rates=48000:channel_layouts=stereo",
-                    "-vf", f"crop={self.recording_dimensions[0]}:{self.recording_dimensions[1]}:10:10", 
-                    "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-g", "30", 
-                    "-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart",
-                    self.file_location
-                ]
+                ffmpeg_cmd = self._build_ffmpeg_cmd(
+                    [*video_global_options, *self._get_audio_input_prefix(), *audio_options, *video_input_options],
+                    [
+                        "-filter:a", "aresample=async=1:min_hard_comp=0.100:first_pts=0,aformat=sample_fmts=s16:sample_rates=48000:channel_layouts=stereo",
+                        *video_encode_options,
+                        "-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart",
+                        "-max_interleave_delta", "50000",  # Don't buffer seconds of video waiting for a late audio packet
+                    ],
+                    self.file_location,
+                )
                 
                 # Try recording with audio
                 if self._attempt_recording(ffmpeg_cmd, display_var, allow_fallback=True):
@@ -1406,18 +2186,15 @@ class ScreenAndAudioRecorder:
                 
                 # If failed and fallback allowed, try video-only
                 logger.warning("Audio recording failed, falling back to video-only recording")
+                ScreenAndAudioRecorder._audio_failed_fingerprint = self._audio_host_fingerprint()
             
             # Video-only recording (either by choice or fallback)
             logger.info("Recording video only (no audio)")
-            ffmpeg_cmd = [
-                "ffmpeg", "-y", "-thread_queue_size", "4096", 
-                "-framerate", "30", 
-                "-video_size", f"{self.screen_dimensions[0]}x{self.screen_dimensions[1]}", 
-                "-f", "x11grab", "-draw_mouse", "0", "-probesize", "500k", "-i", display_var,
-                "-vf", f"crop={self.recording_dimensions[0]}:{self.recording_dimensions[1]}:10:10", 
-                "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-g", "30", 
-                self.file_location
-            ]
+            ffmpeg_cmd = self._build_ffmpeg_cmd(
+                [*video_global_options, *video_input_options],
+                [*video_encode_options, "-movflags", "+faststart"],
+                self.file_location,
+            )
             
             # Final attempt - this should not fail
             self._attempt_recording(ffmpeg_cmd, display_var, allow_fallback=False)
@@ -1427,29 +2204,37 @@ class ScreenAndAudioRecorder:
         Attempt to start recording with the given FFmpeg command.
         Returns True if successful, False if failed and fallback is allowed.
         """
-        logger.info(f"Starting FFmpeg command: {' '.join(ffmpeg_cmd)}")
-        
-        # Open log file for ffmpeg output
-        log_file_handle = None
-        if self.ffmpeg_log_file:
-            try:
-                log_file_handle = open(self.ffmpeg_log_file, 'w')
-                logger.info(f"FFmpeg output will be logged to: {self.ffmpeg_log_file}")
-            except Exception as e:
-                logger.warning(f"Could not create ffmpeg log file {self.ffmpeg_log_file}: {e}")
+        # Report progress on stdout so we can tell when ffmpeg is actually up and encoding.
+        # The first report only comes one stats period after encoding starts (0.5s by default).
+        ffmpeg_cmd = ffmpeg_cmd[:1] + ["-progress", "pipe:1", "-stats_period", "0.1"] + ffmpeg_cmd[1:]
+        # Formatted lazily, the command line is long and only needed when INFO is enabled
+        logger.info("Starting FFmpeg command: %s", ffmpeg_cmd)
         
         # Start ffmpeg with proper error handling
         try:
+            # close_fds=False lets subprocess launch ffmpeg (by absolute path) with posix_spawn, instead of
+            # forking the whole bot controller first. Python's own descriptors are non-inheritable anyway.
             self.ffmpeg_proc = subprocess.Popen(
                 ffmpeg_cmd, 
-                stdout=log_file_handle if log_file_handle else subprocess.DEVNULL, 
-                stderr=subprocess.STDOUT if log_file_handle else subprocess.DEVNULL
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                close_fds=False,
             )
             self.recording_started_time = time.time()
             logger.info(f"FFmpeg process started with PID: {self.ffmpeg_proc.pid}")
+            # Don't leave ffmpeg running if this recorder is dropped without being stopped
+            if self.ffmpeg_finalizer:
+                self.ffmpeg_finalizer.detach()
+            self.ffmpeg_finalizer = weakref.finalize(self, _release_ffmpeg_proc, self.ffmpeg_proc)
+
+            # Keep the tail of ffmpeg's output in memory rather than streaming it to disk for the whole recording
+            self.ffmpeg_stderr_tail = collections.deque(maxlen=256)
+            self.ffmpeg_stderr_thread = threading.Thread(target=self._collect_lines, args=(self.ffmpeg_proc.stderr, self.ffmpeg_stderr_tail), daemon=True)
+            self.ffmpeg_stderr_thread.start()
             
-            # Give ffmpeg a moment to initialize
-            time.sleep(2)  # Increased from 1 to 2 seconds for better detection
+            # Wait until ffmpeg reports progress or exits, rather than sleeping a fixed amount
+            self._wait_for_ffmpeg_ready(timeout_sec=2)
             
             # Check if process is still running after initialization
             if self.ffmpeg_proc.poll() is not None:
@@ -1457,18 +2242,17 @@ class ScreenAndAudioRecorder:
                 logger.error(f"FFmpeg process exited immediately with return code: {return_code}")
                 
                 # Read the error output
-                error_output = ""
-                if self.ffmpeg_log_file and os.path.exists(self.ffmpeg_log_file):
-                    try:
-                        with open(self.ffmpeg_log_file, 'r') as f:
-                            error_output = f.read()
-                            logger.error(f"FFmpeg error output: {error_output}")
-                    except Exception as e:
-                        logger.error(f"Could not read ffmpeg log file: {e}")
+                error_output = self._get_ffmpeg_output()
+                if error_output:
+                    logger.error(f"FFmpeg error output: {error_output}")
+                self._write_ffmpeg_log(error_output)
                 
                 # Check if this is an audio-related error that we can recover from
                 if allow_fallback and self._is_audio_related_error(error_output):
                     logger.warning("Detected audio-related error, will attempt video-only fallback")
+                    # The cached probe result evidently doesn't work anymore. start_recording skips audio
+                    # until the audio setup changes, and then it has to be probed afresh
+                    self._audio_options_cache.clear()
                     self.ffmpeg_proc = None
                     return False  # Indicate fallback should be attempted
                 
@@ -1477,6 +2261,7 @@ class ScreenAndAudioRecorder:
                 raise RuntimeError(f"FFmpeg process failed to start (exit code: {return_code})")
             else:
                 logger.info("FFmpeg process started successfully")
+                self._start_page_cache_trimming()
                 return True  # Success
                 
         except Exception as e:
@@ -1485,86 +2270,285 @@ class ScreenAndAudioRecorder:
                 logger.warning("Audio-related error detected, will attempt fallback")
                 return False
             raise
+
+    def _wait_for_ffmpeg_ready(self, timeout_sec=2):
+        """
+        Block until ffmpeg writes its first progress report (inputs opened, encoding started),
+        exits, or timeout_sec passes. Afterwards the progress pipe is drained in the background
+        so ffmpeg never blocks on it.
+        """
+        proc = self.ffmpeg_proc
+        fd = proc.stdout.fileno()
+        deadline = time.monotonic() + timeout_sec
+        output = b""
+        while b"progress=" not in output:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                break
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                # Pipe closed, ffmpeg is exiting
+                try:
+                    proc.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    pass
+                break
+            output += chunk
+
+        threading.Thread(target=self._drain_pipe, args=(proc.stdout,), daemon=True).start()
+
+    @staticmethod
+    def _collect_lines(pipe, lines):
+        """Append each line read from pipe to lines (a bounded deque) until the pipe is closed"""
+        try:
+            for line in iter(pipe.readline, b""):
+                lines.append(line.decode(errors="replace"))
+        except (OSError, ValueError):
+            pass
+        finally:
+            pipe.close()
+
+    def _get_ffmpeg_output(self):
+        """Return the collected tail of ffmpeg's output, once the reader has caught up with an exited process"""
+        if self.ffmpeg_stderr_thread:
+            self.ffmpeg_stderr_thread.join(timeout=1)
+        return "".join(self.ffmpeg_stderr_tail).strip()
+
+    def _write_ffmpeg_log(self, output):
+        """Persist ffmpeg output to ffmpeg_log_file for debugging a failed recording"""
+        if not self.ffmpeg_log_file or not output:
+            return
+        try:
+            with open(self.ffmpeg_log_file, 'w') as f:
+                f.write(output + "\n")
+            logger.info(f"FFmpeg output written to: {self.ffmpeg_log_file}")
+        except OSError as e:
+            logger.warning(f"Could not write ffmpeg log file {self.ffmpeg_log_file}: {e}")
+
+    @staticmethod
+    def _drain_pipe(pipe):
+        """Discard everything written to pipe until it is closed"""
+        try:
+            while pipe.read(65536):
+                pass
+        except (OSError, ValueError):
+            pass
         finally:
-            if log_file_handle:
-                log_file_handle.close()
+            pipe.close()
+
+    def _start_page_cache_trimming(self):
+        """
+        Periodically start writeback of the recording file and drop what has been written back from
+        the page cache, so a long recording doesn't pile up dirty pages that stall ffmpeg when they
+        are flushed all at once.
+        """
+        if not self.file_location or not hasattr(os, "posix_fadvise"):
+            return
+        self.page_cache_trim_stop = threading.Event()
+        threading.Thread(target=self._trim_page_cache, args=(self.file_location, self.page_cache_trim_stop), daemon=True).start()
+
+    def _stop_page_cache_trimming(self):
+        if self.page_cache_trim_stop:
+            self.page_cache_trim_stop.set()
+            self.page_cache_trim_stop = None
+
+    @staticmethod
+    def _trim_page_cache(path, stop_event):
+        sync_file_range = _sync_file_range()
+        fd = None
+        # End of the part of the file whose writeback was started on an earlier pass
+        written = 0
+        try:
+            while not stop_event.wait(PAGE_CACHE_TRIM_INTERVAL_SECONDS):
+                try:
+                    if fd is None:
+                        fd = os.open(path, os.O_RDONLY)
+                    size = os.fstat(fd).st_size
+                    # Writeback started a pass ago has had a whole interval to finish. Only clean pages
+                    # are dropped, anything still dirty stays cached rather than being waited for.
+                    if written:
+                        os.posix_fadvise(fd, 0, written, os.POSIX_FADV_DONTNEED)
+                    # Nudge writeback of what ffmpeg appended since, without blocking on it like fdatasync
+                    if sync_file_range is not None and size > written:
+                        if sync_file_range(fd, written, size - written, SYNC_FILE_RANGE_WRITE) != 0:
+                            errno = ctypes.get_errno()
+                            raise OSError(errno, os.strerror(errno))
+                    written = size
+                except OSError as e:
+                    logger.debug(f"Could not trim page cache for {path}: {e}")
+        finally:
+            if fd is not None:
+                os.close(fd)
 
     def _is_audio_related_error(self, error_output):
         """Check if FFmpeg error output indicates an audio-related problem"""
         if not error_output:
             return False
-            
-        error_output_lower = error_output.lower()
-        audio_error_patterns = [
-            "no such process",
-            "input/output error", 
-            "alsa",
-            "pulse",
-            "audio device",
-            "default:",
-            "cannot open audio device",
-            "no such file or directory",
-            "chromesink.monitor",              # <— add this
-            "device or resource busy",         # Common PulseAudio error
-            "connection timed out",            # Network/socket issues
-            "invalid argument",                # Format mismatch errors
-        ]
-        
-        return any(pattern in error_output_lower for pattern in audio_error_patterns)
 
-    # Pauses by muting the audio and showing a black xterm covering the entire screen
+        return _AUDIO_ERROR_RE.search(error_output) is not None
+
+    # Pauses by muting the audio and showing a black window covering the entire screen
     def pause_recording(self):
         if self.paused:
             return True  # Already paused, consider this success
 
         try:
-            sw, sh = self.screen_dimensions
-
-            x, y = 0, 0
-
-            self.xterm_proc = subprocess.Popen(["xterm", "-bg", "black", "-fg", "black", "-geometry", f"{sw}x{sh}+{x}+{y}", "-xrm", "*borderWidth:0", "-xrm", "*scrollBar:false"])
-
-            subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "1"], check=True)
+            self._apply_pause_state(True)
             self.paused = True
             return True
         except Exception as e:
             logger.error(f"Failed to pause recording: {e}")
             return False
 
-    # Resumes by unmuting the audio and killing the xterm proc
+    # Resumes by unmuting the audio and hiding the black window
     def resume_recording(self):
         if not self.paused:
             return True
 
         try:
-            self.xterm_proc.terminate()
-            self.xterm_proc.wait()
-            self.xterm_proc = None
-            subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"], check=True)
+            self._apply_pause_state(False)
             self.paused = False
             return True
         except Exception as e:
             logger.error(f"Failed to resume recording: {e}")
             return False
 
+    def _apply_pause_state(self, paused):
+        """
+        Show or hide the blackout and mute or unmute the sink. The two don't depend on each other,
+        so they run side by side, and waiting on a pactl mute left over from the previous
+        transition doesn't hold up the picture.
+        """
+        if self._pause_pool is None:
+            self._pause_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="pause-state")
+        futures = [
+            self._pause_pool.submit(self._show_blackout if paused else self._hide_blackout),
+            self._pause_pool.submit(self._set_sink_mute, paused),
+        ]
+        for future in futures:
+            # Raises whatever the side effect raised
+            future.result()
+
+    def _show_blackout(self):
+        """
+        Cover the screen in black. With python-xlib this maps a window kept across pauses,
+        otherwise a fullscreen black xterm is started.
+        """
+        window = self._get_blackout_window()
+        if window is not None:
+            try:
+                window.raise_window()
+                window.map()
+                self._blackout_display.sync()
+                return
+            except Exception as e:
+                logger.debug(f"Could not map the blackout window, falling back to xterm: {e}")
+                self._close_blackout_window()
+
+        sw, sh = self.screen_dimensions
+
+        x, y = 0, 0
+
+        self.xterm_proc = subprocess.Popen(["xterm", "-bg", "black", "-fg", "black", "-geometry", f"{sw}x{sh}+{x}+{y}", "-xrm", "*borderWidth:0", "-xrm", "*scrollBar:false"])
+
+    def _hide_blackout(self):
+        if self.xterm_proc:
+            # No need to wait for xterm to exit, subprocess reaps it once the Popen object is dropped
+            self.xterm_proc.terminate()
+            self.xterm_proc = None
+        elif self._blackout_window is not None:
+            self._blackout_window.unmap()
+            self._blackout_display.sync()
+
+    def _get_blackout_window(self):
+        """The blackout window, created on first use. None if python-xlib can't be imported or the display can't be opened."""
+        xlib_display = _xlib_display_module()
+        if xlib_display is None:
+            return None
+        if self._blackout_window is None:
+            try:
+                self._blackout_display = xlib_display.Display()
+                screen = self._blackout_display.screen()
+                # Override-redirect keeps the window manager from decorating or placing it
+                self._blackout_window = screen.root.create_window(
+                    0, 0, screen.width_in_pixels, screen.height_in_pixels, 0, screen.root_depth,
+                    background_pixel=screen.black_pixel, override_redirect=True,
+                )
+            except Exception as e:
+                logger.debug(f"Could not create the blackout window: {e}")
+                self._close_blackout_window()
+                return None
+        return self._blackout_window
+
+    def _close_blackout_window(self):
+        self._blackout_window = None
+        if self._blackout_display is not None:
+            try:
+                self._blackout_display.close()
+            except Exception:
+                pass
+            self._blackout_display = None
+
+    def _set_sink_mute(self, muted):
+        """
+        Mute or unmute the default sink, over the pause pulsectl connection when there is one,
+        else without blocking on pactl. The previous request is waited for first, so a quick
+        pause/resume can't be applied out of order.
+        """
+        if self.sink_mute_proc:
+            try:
+                returncode = self.sink_mute_proc.wait(timeout=5)
+                if returncode != 0:
+                    logger.warning(f"pactl set-sink-mute exited with code {returncode}")
+            except subprocess.TimeoutExpired:
+                self.sink_mute_proc.kill()
+                logger.warning("pactl set-sink-mute did not finish, killed it")
+            self.sink_mute_proc = None
+
+        pulse = self._get_pause_pulse()
+        if pulse is not None:
+            try:
+                pulse.sink_mute(pulse.get_sink_by_name(pulse.server_info().default_sink_name).index, muted)
+                return
+            except Exception as e:
+                logger.debug(f"pulsectl failed to set sink mute, falling back to pactl: {e}")
+                self._close_pause_pulse()
+
+        self.sink_mute_proc = subprocess.Popen(
+            ["pactl", "set-sink-mute", "@DEFAULT_SINK@", "1" if muted else "0"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
     def stop_recording(self):
         if not self.ffmpeg_proc:
             return
             
         logger.info(f"Stopping FFmpeg process (PID: {self.ffmpeg_proc.pid})")
+        self._stop_page_cache_trimming()
+        # If ffmpeg is already gone before we asked it to stop, the recording failed
+        exited_early = self.ffmpeg_proc.poll() is not None
         
         try:
-            # First try graceful termination
-            self.ffmpeg_proc.terminate()
+            # First try graceful shutdown. SIGINT is ffmpeg's equivalent of pressing 'q',
+            # it finishes writing the file (moov atom included) before exiting
+            self.ffmpeg_proc.send_signal(signal.SIGINT)
             
-            # Wait up to 5 seconds for graceful shutdown
+            # Wait up to 10 seconds for graceful shutdown, finalizing large files takes a while
             try:
-                self.ffmpeg_proc.wait(timeout=5)
+                _wait_for_exit(self.ffmpeg_proc, timeout=10)
                 logger.info("FFmpeg process terminated gracefully")
             except subprocess.TimeoutExpired:
-                logger.warning("FFmpeg process did not terminate gracefully, forcing kill")
-                self.ffmpeg_proc.kill()
-                self.ffmpeg_proc.wait()
+                logger.warning("FFmpeg process did not stop after SIGINT, sending SIGTERM")
+                self.ffmpeg_proc.terminate()
+                try:
+                    _wait_for_exit(self.ffmpeg_proc, timeout=5)
+                except subprocess.TimeoutExpired:
+                    logger.warning("FFmpeg process did not terminate gracefully, forcing kill")
+                    self.ffmpeg_proc.kill()
+                    self.ffmpeg_proc.wait()
                 
         except Exception as e:
             logger.error(f"Error stopping FFmpeg process: {e}")
@@ -1576,14 +2560,27 @@ class ScreenAndAudioRecorder:
         
         finally:
             self.ffmpeg_proc = None
+            if self.ffmpeg_finalizer:
+                self.ffmpeg_finalizer.detach()
+                self.ffmpeg_finalizer = None
+
+        if exited_early:
+            logger.warning("FFmpeg process had already exited before it was stopped")
+            self._write_ffmpeg_log(self._get_ffmpeg_output())
             
         # Log recording duration and check file creation
         if self.recording_started_time:
             duration = time.time() - self.recording_started_time
             logger.info(f"Recording duration: {duration:.2f} seconds")
             
-        if self.file_location and os.path.exists(self.file_location):
-            file_size = os.path.getsize(self.file_location)
+        file_size = None
+        if self.file_location:
+            try:
+                file_size = os.stat(self.file_location).st_size
+            except FileNotFoundError:
+                pass
+
+        if file_size is not None:
             logger.info(f"Recording file created: {self.file_location} ({file_size} bytes)")
         else:
             logger.warning(f"Recording file not found or empty: {self.file_location}")
@@ -1599,10 +2596,18 @@ class ScreenAndAudioRecorder:
         if self.ffmpeg_proc.poll() is not None:
             return False, f"FFmpeg process exited with code {self.ffmpeg_proc.returncode}"
             
-        # Check if file exists and is growing
-        if self.file_location and os.path.exists(self.file_location):
-            file_size = os.path.getsize(self.file_location)
-            duration = time.time() - self.recording_started_time if self.recording_started_time else 0
+        # Check if file exists and is growing (single stat call, this runs on every health poll)
+        file_stat = None
+        if self.file_location:
+            try:
+                file_stat = os.stat(self.file_location)
+            except FileNotFoundError:
+                pass
+
+        duration = time.time() - self.recording_started_time if self.recording_started_time else 0
+
+        if file_stat is not None:
+            file_size = file_stat.st_size
             
             # For recordings longer than 10 seconds, expect at least some data
             if duration > 10 and file_size == 0:
@@ -1610,13 +2615,14 @@ class ScreenAndAudioRecorder:
                 
             return True, f"Recording healthy: {file_size} bytes after {duration:.1f}s"
         else:
-            duration = time.time() - self.recording_started_time if self.recording_started_time else 0
             # Allow some time for file creation
             if duration > 5:
                 return False, f"Recording file not created after {duration:.1f} seconds"
             return True, "Recording starting up"
 
-    def get_seekable_path(self, path):
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def get_seekable_path(path):
         """
         Transform a file path to include '.seekable' before the extension.
         Example: /tmp/file.webm -> /tmp/file.seekable.webm
@@ -1625,27 +2631,42 @@ class ScreenAndAudioRecorder:
         return f"{base}.seekable{ext}"
 
     def cleanup(self):
+        self._close_pulse()
+        self._close_blackout_window()
+        if self._pause_pool is not None:
+            # Let a pause/resume still in flight finish with the pause connection before closing it
+            self._pause_pool.shutdown(wait=True)
+            self._pause_pool = None
+        self._close_pause_pulse()
+
         input_path = self.file_location
 
         # If no input path at all, then we aren't trying to generate a file at all
         if input_path is None:
             return
 
-        # Clean up ffmpeg log file if it exists
-        if self.ffmpeg_log_file and os.path.exists(self.ffmpeg_log_file):
+        # Log any final ffmpeg output
+        log_content = self._get_ffmpeg_output()
+        if log_content:
+            logger.info(f"Final FFmpeg log output: {log_content}")
+
+        # Clean up ffmpeg log file if one was written
+        if self.ffmpeg_log_file:
             try:
-                # Log any final ffmpeg output before cleanup
-                with open(self.ffmpeg_log_file, 'r') as f:
-                    log_content = f.read().strip()
-                    if log_content:
-                        logger.info(f"Final FFmpeg log output: {log_content}")
                 os.remove(self.ffmpeg_log_file)
                 logger.info(f"Cleaned up FFmpeg log file: {self.ffmpeg_log_file}")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"Could not clean up FFmpeg log file {self.ffmpeg_log_file}: {e}")
 
         # Check if input file exists
-        if not os.path.exists(input_path):
+        try:
+            file_size = os.stat(input_path).st_size
+        except FileNotFoundError:
+            file_size = None
+
+        if file_size is None:
             logger.warning(f"Input file does not exist at {input_path}")
             
             # Instead of creating an empty file, check if ffmpeg was killed unexpectedly
@@ -1653,25 +2674,32 @@ class ScreenAndAudioRecorder:
                 duration = time.time() - self.recording_started_time
                 logger.error(f"Recording was expected to run for {duration:.2f} seconds but no file was created")
                 
-                # Check for partial/temporary files that might exist
-                temp_patterns = [
-                    input_path + ".tmp",
-                    input_path + ".part", 
-                    input_path + "~"
-                ]
-                
-                for temp_path in temp_patterns:
-                    if os.path.exists(temp_path):
-                        logger.info(f"Found partial recording file: {temp_path}")
-                        try:
-                            os.rename(temp_path, input_path)
-                            logger.info(f"Recovered partial recording: {temp_path} -> {input_path}")
-                            break
-                        except Exception as e:
-                            logger.error(f"Could not recover partial recording {temp_path}: {e}")
+                # Check for partial/temporary files that might exist, listing the directory once
+                # rather than checking each candidate separately
+                input_dir, input_name = os.path.split(input_path)
+                try:
+                    with os.scandir(input_dir or ".") as it:
+                        dir_entries = {entry.name for entry in it}
+                except OSError:
+                    dir_entries = set()
+
+                input_exists = input_name in dir_entries
+                for suffix in (".tmp", ".part", "~"):
+                    if input_exists:
+                        break
+                    if input_name + suffix not in dir_entries:
+                        continue
+                    temp_path = input_path + suffix
+                    logger.info(f"Found partial recording file: {temp_path}")
+                    try:
+                        os.rename(temp_path, input_path)
+                        logger.info(f"Recovered partial recording: {temp_path} -> {input_path}")
+                        input_exists = True
+                    except Exception as e:
+                        logger.error(f"Could not recover partial recording {temp_path}: {e}")
                 
                 # If still no file, create empty one as last resort
-                if not os.path.exists(input_path):
+                if not input_exists:
                     logger.info(f"Creating empty file as fallback: {input_path}")
                     with open(input_path, "wb"):
                         pass  # Create empty file
@@ -1682,7 +2710,6 @@ class ScreenAndAudioRecorder:
             return
 
         # Log file size for debugging
-        file_size = os.path.getsize(input_path)
         logger.info(f"Processing recording file: {input_path} ({file_size} bytes)")
 
         # if audio only, we don't need to make it seekable
@@ -1699,7 +2726,17 @@ class ScreenAndAudioRecorder:
             logger.warning(f"Input file is very small ({file_size} bytes), skipping seekability processing")
             return
 
-        output_path = self.get_seekable_path(self.file_location)
+        extension = os.path.splitext(input_path)[1].lower()
+        if extension in NON_MP4_EXTENSIONS:
+            logger.info(f"Recording file is {extension}, skipping seekability processing")
+            return
+
+        # ffmpeg already wrote the moov atom up front (+faststart on a clean shutdown), nothing to do
+        if extension in MP4_EXTENSIONS and moov_precedes_mdat(input_path):
+            logger.info("Recording file is already seekable, skipping seekability processing")
+            return
+
+        output_path = ScreenAndAudioRecorder.get_seekable_path(input_path)
         # the file is seekable, so we don't need to make it seekable
         try:
             self.make_file_seekable(input_path, output_path)
@@ -1708,28 +2745,22 @@ class ScreenAndAudioRecorder:
             return
 
     def make_file_seekable(self, input_path, tempfile_path):
-        """Use ffmpeg to move the moov atom to the beginning of the file."""
+        """Move the moov atom to the beginning of the file."""
         logger.info(f"Making file seekable: {input_path} -> {tempfile_path}")
         # log how many bytes are in the file
         logger.info(f"File size: {os.path.getsize(input_path)} bytes")
-        command = [
-            "ffmpeg",
-            "-i",
-            str(input_path),  # Input file
-            "-c",
-            "copy",  # Copy streams without re-encoding
-            "-avoid_negative_ts",
-            "make_zero",  # Optional: Helps ensure timestamps start at or after 0
-            "-movflags",
-            "+faststart",  # Optimize for web playback
-            "-y",  # Overwrite output file without asking
-            str(tempfile_path),  # Output file
-        ]
 
-        result = subprocess.run(command, capture_output=True, text=True)
+        # For MP4/MOV, relocate the moov atom directly; this reads and writes the file once,
+        # where an ffmpeg +faststart remux writes it and then shifts it again
+        relocated = False
+        if os.path.splitext(str(input_path))[1].lower() in MP4_EXTENSIONS:
+            try:
+                relocated = make_mp4_faststart(str(input_path), str(tempfile_path))
+            except Exception as e:
+                logger.warning(f"Could not relocate moov atom directly, falling back to ffmpeg remux: {e}")
 
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg failed to make file seekable: {result.stderr}")
+        if not relocated:
+            self._remux_with_faststart(input_path, tempfile_path)
 
         # Replace the original file with the seekable version
         try:
@@ -1737,4 +2768,27 @@ class ScreenAndAudioRecorder:
             logger.info(f"Replaced original file with seekable version: {input_path}")
         except Exception as e:
             logger.error(f"Failed to replace original file with seekable version: {e}")
-            raise RuntimeError(f"Failed to replace original file: {e}")
\ No newline at end of file
+            raise RuntimeError(f"Failed to replace original file: {e}")
+
+    def _remux_with_faststart(self, input_path, tempfile_path):
+        """Use ffmpeg to remux the file with the moov atom at the beginning."""
+        command = self._build_ffmpeg_cmd(
+            ["-i", str(input_path)],
+            [
+                "-c", "copy",  # Copy streams without re-encoding
+                "-avoid_negative_ts", "make_zero",  # Optional: Helps ensure timestamps start at or after 0
+                "-movflags", "+faststart",  # Optimize for web playback
+            ],
+            tempfile_path,
+        )
+
+        # Stream stderr and only keep its tail, long remuxes can produce a lot of output
+        stderr_tail = collections.deque(maxlen=64)
+        proc = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, bufsize=1, text=True)
+        for line in proc.stderr:
+            stderr_tail.append(line)
+        proc.stderr.close()
+        returncode = proc.wait()
+
+        if returncode != 0:
+            raise RuntimeError(f"FFmpeg failed to make file seekable: {''.join(stderr_tail)}")
\ No newline at end of file
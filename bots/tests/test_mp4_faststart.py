@@ -0,0 +1,89 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from bots.bot_controller.mp4_faststart import make_mp4_faststart, moov_precedes_mdat, read_top_level_atoms
+
+
+def atom(atom_type, payload):
+    return struct.pack(">I4s", 8 + len(payload), atom_type) + payload
+
+
+def build_mp4(chunks, moov_first=False):
+    """Build a minimal MP4 with one track whose stco table points at each chunk inside mdat"""
+    ftyp = atom(b"ftyp", b"isom" + struct.pack(">I", 512) + b"isomiso2")
+    mdat = atom(b"mdat", b"".join(chunks))
+
+    def moov_with_offsets(mdat_offset):
+        offsets = []
+        position = mdat_offset + 8
+        for chunk in chunks:
+            offsets.append(position)
+            position += len(chunk)
+        stco = atom(b"stco", struct.pack(">II", 0, len(offsets)) + b"".join(struct.pack(">I", o) for o in offsets))
+        return atom(b"moov", atom(b"trak", atom(b"mdia", atom(b"minf", atom(b"stbl", stco)))))
+
+    if moov_first:
+        moov_size = len(moov_with_offsets(0))
+        return ftyp + moov_with_offsets(len(ftyp) + moov_size) + mdat
+    return ftyp + mdat + moov_with_offsets(len(ftyp))
+
+
+def read_chunk_offsets(data):
+    stco_index = data.index(b"stco")
+    entry_count = struct.unpack_from(">I", data, stco_index + 8)[0]
+    return [struct.unpack_from(">I", data, stco_index + 12 + 4 * i)[0] for i in range(entry_count)]
+
+
+class TestMp4Faststart(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, "input.mp4")
+        self.output_path = os.path.join(self.temp_dir.name, "output.mp4")
+        self.chunks = [b"first-chunk", b"second-chunk-data", b"third"]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_moves_moov_before_mdat_and_shifts_chunk_offsets(self):
+        with open(self.input_path, "wb") as f:
+            f.write(build_mp4(self.chunks))
+
+        self.assertTrue(make_mp4_faststart(self.input_path, self.output_path))
+
+        with open(self.output_path, "rb") as f:
+            self.assertEqual([a[0] for a in read_top_level_atoms(f)], [b"ftyp", b"moov", b"mdat"])
+            f.seek(0)
+            data = f.read()
+
+        self.assertEqual(len(data), os.path.getsize(self.input_path))
+        for offset, chunk in zip(read_chunk_offsets(data), self.chunks):
+            self.assertEqual(data[offset : offset + len(chunk)], chunk)
+
+    def test_returns_false_when_moov_already_first(self):
+        with open(self.input_path, "wb") as f:
+            f.write(build_mp4(self.chunks, moov_first=True))
+
+        self.assertFalse(make_mp4_faststart(self.input_path, self.output_path))
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def test_raises_on_truncated_file(self):
+        with open(self.input_path, "wb") as f:
+            f.write(build_mp4(self.chunks)[:-10])
+
+        with self.assertRaises(ValueError):
+            make_mp4_faststart(self.input_path, self.output_path)
+
+    def test_moov_precedes_mdat(self):
+        with open(self.input_path, "wb") as f:
+            f.write(build_mp4(self.chunks, moov_first=True))
+        self.assertTrue(moov_precedes_mdat(self.input_path))
+
+        with open(self.input_path, "wb") as f:
+            f.write(build_mp4(self.chunks))
+        self.assertFalse(moov_precedes_mdat(self.input_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
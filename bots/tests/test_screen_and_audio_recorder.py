@@ -0,0 +1,643 @@
+import json
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+import weakref
+from unittest.mock import MagicMock, patch
+
+from bots.bot_controller.screen_and_audio_recorder import CHROMESINK_AUDIO_INPUT_OPTIONS, ScreenAndAudioRecorder, _ProbeProcesses, _release_ffmpeg_proc, _vaapi_can_encode_h264, _wait_for_exit
+
+
+class TestScreenAndAudioRecorderAudioInput(unittest.TestCase):
+    def setUp(self):
+        self.recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+        self.recorder.pulseaudio_setup_attempted = True
+        ScreenAndAudioRecorder.clear_audio_cache()
+
+        # Pretend every audio backend is present on the host unless a test says otherwise
+        self.pulse_available_patcher = patch.object(ScreenAndAudioRecorder, "_pulse_server_available", return_value=True)
+        self.path_exists_patcher = patch("bots.bot_controller.screen_and_audio_recorder.os.path.exists", return_value=True)
+        self.mock_pulse_available = self.pulse_available_patcher.start()
+        self.mock_path_exists = self.path_exists_patcher.start()
+
+    def tearDown(self):
+        self.pulse_available_patcher.stop()
+        self.path_exists_patcher.stop()
+        ScreenAndAudioRecorder.clear_audio_cache()
+
+    @patch.object(ScreenAndAudioRecorder, "_check_pulseaudio_chromesink_exists", return_value=False)
+    def test_fallback_probe_prefers_first_working_method(self, _mock_chromesink_exists):
+        # Both ALSA methods work, but PulseAudio default does not
+        def fake_test_audio_input(audio_cmd, description, probe_procs=None):
+            return description.startswith("ALSA")
+
+        with patch.object(self.recorder, "_test_audio_input", side_effect=fake_test_audio_input):
+            audio_options = self.recorder._get_audio_input_options()
+
+        self.assertIn("alsa", audio_options)
+        self.assertEqual(audio_options[-1], "default")
+
+    @patch.object(ScreenAndAudioRecorder, "_check_pulseaudio_chromesink_exists", return_value=False)
+    def test_fallback_probe_returns_none_when_nothing_works(self, _mock_chromesink_exists):
+        with patch.object(self.recorder, "_test_audio_input", return_value=False):
+            self.assertIsNone(self.recorder._get_audio_input_options())
+
+    @patch.object(ScreenAndAudioRecorder, "_check_pulseaudio_chromesink_exists", return_value=False)
+    def test_fallback_probe_result_is_cached_across_recorders(self, _mock_chromesink_exists):
+        with patch.object(ScreenAndAudioRecorder, "_test_audio_input", return_value=True) as mock_test_audio_input:
+            first_options = self.recorder._get_audio_input_options()
+            probe_count = mock_test_audio_input.call_count
+
+            other_recorder = ScreenAndAudioRecorder(file_location="/tmp/other_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+            other_recorder.pulseaudio_setup_attempted = True
+            second_options = other_recorder._get_audio_input_options()
+
+        self.assertEqual(first_options, second_options)
+        self.assertEqual(mock_test_audio_input.call_count, probe_count)
+
+    @patch.object(ScreenAndAudioRecorder, "_check_pulseaudio_chromesink_exists", return_value=False)
+    def test_force_audio_reprobe_bypasses_cache(self, _mock_chromesink_exists):
+        with patch.object(ScreenAndAudioRecorder, "_test_audio_input", return_value=True) as mock_test_audio_input:
+            self.recorder._get_audio_input_options()
+            probe_count = mock_test_audio_input.call_count
+
+            with patch.dict(os.environ, {"FORCE_AUDIO_REPROBE": "1"}):
+                self.recorder._get_audio_input_options()
+
+        self.assertEqual(mock_test_audio_input.call_count, 2 * probe_count)
+
+    @patch.object(ScreenAndAudioRecorder, "_check_pulseaudio_chromesink_exists", return_value=False)
+    def test_fallback_probe_skips_backends_missing_on_host(self, _mock_chromesink_exists):
+        self.mock_pulse_available.return_value = False
+        self.mock_path_exists.return_value = False
+
+        with patch.object(self.recorder, "_test_audio_input", return_value=True) as mock_test_audio_input:
+            self.assertIsNone(self.recorder._get_audio_input_options())
+
+        mock_test_audio_input.assert_not_called()
+
+    @patch.object(ScreenAndAudioRecorder, "_check_audio_device", return_value=None)
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.Popen")
+    def test_probe_started_after_cancel_is_killed(self, mock_popen, _mock_check_audio_device):
+        # A lower-priority probe still spawning ffmpeg when the caller already picked a winner
+        probe_procs = _ProbeProcesses()
+        probe_procs.cancel()
+
+        self.assertFalse(self.recorder._test_audio_input(["-f", "alsa", "-i", "default"], "ALSA default", probe_procs))
+
+        mock_popen.return_value.kill.assert_called_once()
+        mock_popen.return_value.communicate.assert_called_once_with()
+
+    @patch("bots.bot_controller.screen_and_audio_recorder._pasimple_module", return_value=None)
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_monitor_signal_probe_falls_back_to_ffmpeg(self, mock_run, _mock_pasimple_module):
+        mock_run.return_value = MagicMock(stderr="[Parsed_volumedetect_0] max_volume: -23.5 dB\n")
+        self.assertTrue(self.recorder.monitor_has_signal(timeout_sec=1))
+
+        mock_run.return_value = MagicMock(stderr="[Parsed_volumedetect_0] max_volume: -inf dB\n")
+        self.assertFalse(self.recorder.monitor_has_signal(timeout_sec=1))
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_monitor_signal_probe_reads_monitor_directly(self, mock_run):
+        fake_pasimple = MagicMock()
+        stream = fake_pasimple.PaSimple.return_value.__enter__.return_value
+
+        with patch("bots.bot_controller.screen_and_audio_recorder._pasimple_module", return_value=fake_pasimple):
+            # Speech only starts in the third 100ms read, the probe keeps listening until then
+            stream.read.side_effect = [b"\x00\x00" * 100, b"\x00\x00" * 100, b"\x00\x00" * 100 + b"\x00\x80"]
+            self.assertTrue(self.recorder.monitor_has_signal(timeout_sec=1))
+            self.assertEqual(stream.read.call_count, 3)
+
+            # A noise floor never crosses the silence threshold, however long the probe listens
+            stream.read.reset_mock()
+            stream.read.side_effect = None
+            stream.read.return_value = b"\x08\x00\xf8\xff" * 50
+            self.assertFalse(self.recorder.monitor_has_signal(timeout_sec=1))
+            self.assertEqual(stream.read.call_count, 10)
+
+        mock_run.assert_not_called()
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.Popen")
+    def test_audio_setup_test_listens_while_test_sound_plays(self, mock_popen):
+        fake_pasimple = MagicMock()
+        stream = fake_pasimple.PaSimple.return_value.__enter__.return_value
+        stream.read.side_effect = [b"\x00\x00" * 100, b"\x00\x10" * 100]
+        mock_popen.return_value.wait.return_value = 0
+
+        with patch("bots.bot_controller.screen_and_audio_recorder._pasimple_module", return_value=fake_pasimple), patch.object(self.recorder, "monitor_has_signal") as mock_monitor_has_signal:
+            self.assertTrue(self.recorder.test_chrome_audio_setup())
+
+        mock_popen.assert_called_once()
+        self.assertEqual(mock_popen.call_args.args[0][0], "paplay")
+        self.assertEqual(stream.read.call_count, 2)
+        mock_monitor_has_signal.assert_not_called()
+
+    def test_device_check_answers_alsa_hw_without_ffmpeg(self):
+        with patch("bots.bot_controller.screen_and_audio_recorder.subprocess.Popen") as mock_popen:
+            self.assertTrue(self.recorder._test_audio_input(["-f", "alsa", "-i", "hw:0"], "ALSA hw:0"))
+            self.mock_path_exists.return_value = False
+            self.assertFalse(self.recorder._test_audio_input(["-f", "alsa", "-i", "hw:0"], "ALSA hw:0"))
+
+        mock_popen.assert_not_called()
+        self.mock_path_exists.assert_called_with("/dev/snd/pcmC0D0c")
+
+    def test_is_audio_related_error(self):
+        self.assertTrue(self.recorder._is_audio_related_error("[pulse @ 0x5581] ChromeSink.monitor: Connection refused"))
+        self.assertTrue(self.recorder._is_audio_related_error("default: Input/output error"))
+        self.assertFalse(self.recorder._is_audio_related_error("Cannot open display :99, error 1."))
+        self.assertFalse(self.recorder._is_audio_related_error(""))
+
+
+PACTL_SINK_INPUTS_OUTPUT = """Sink Input #12
+\tDriver: protocol-native.c
+\tSink: 0
+\tProperties:
+\t\tmedia.name = "Playback"
+\t\tapplication.name = "Google Chrome"
+\t\tapplication.process.binary = "chrome"
+
+Sink Input #13
+\tDriver: protocol-native.c
+\tSink: 0
+\tProperties:
+\t\tapplication.name = "paplay"
+"""
+
+
+@patch("bots.bot_controller.screen_and_audio_recorder._pulsectl_module", return_value=None)
+class TestScreenAndAudioRecorderPulseQueries(unittest.TestCase):
+    def setUp(self):
+        self.recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+        ScreenAndAudioRecorder._pactl_json_supported = None
+
+    def tearDown(self):
+        ScreenAndAudioRecorder._pactl_json_supported = None
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_queries_share_one_pactl_json_snapshot(self, mock_run, _mock_pulsectl_module):
+        snapshot = {
+            "sinks": [{"index": 1, "name": "ChromeSink"}],
+            "sources": [{"index": 2, "name": "ChromeSink.monitor"}],
+            "sink_inputs": [{"index": 12, "properties": {"application.name": "Google Chrome"}}],
+        }
+        mock_run.return_value = MagicMock(returncode=0, stdout=json.dumps(snapshot), stderr="")
+
+        self.assertEqual(self.recorder._list_pulse_names("sinks"), {"ChromeSink"})
+        self.assertEqual(self.recorder._list_pulse_names("sources"), {"ChromeSink.monitor"})
+        self.assertEqual(self.recorder._list_sink_inputs(), [(12, {"application.name": "Google Chrome"})])
+        mock_run.assert_called_once()
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_list_pulse_names_with_pactl_text_output(self, mock_run, _mock_pulsectl_module):
+        ScreenAndAudioRecorder._pactl_json_supported = False
+        mock_run.return_value = MagicMock(returncode=0, stdout="0\tChromeSink.monitor\tmodule-null-sink.c\ts16le 2ch 48000Hz\tIDLE\n")
+        self.assertEqual(self.recorder._list_pulse_names("sources"), {"ChromeSink.monitor"})
+
+        mock_run.return_value = MagicMock(returncode=1, stdout="")
+        self.assertIsNone(self.recorder._list_pulse_names("sources"))
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_list_sink_inputs_with_pactl_text_output(self, mock_run, _mock_pulsectl_module):
+        ScreenAndAudioRecorder._pactl_json_supported = False
+        mock_run.return_value = MagicMock(returncode=0, stdout=PACTL_SINK_INPUTS_OUTPUT)
+
+        sink_inputs = self.recorder._list_sink_inputs()
+
+        self.assertEqual([sink_input_id for sink_input_id, _ in sink_inputs], [12, 13])
+        self.assertTrue(self.recorder._is_chrome_sink_input(sink_inputs[0][1]))
+        self.assertFalse(self.recorder._is_chrome_sink_input(sink_inputs[1][1]))
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_move_sink_inputs_batches_into_one_pacmd_call(self, mock_run, _mock_pulsectl_module):
+        mock_run.return_value = MagicMock(returncode=0, stdout=">>> >>> >>> ", stderr="")
+
+        self.assertEqual(self.recorder._move_sink_inputs(["12", "13"], "ChromeSink"), {})
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args.args[0], ["pacmd"])
+        self.assertEqual(mock_run.call_args.kwargs["input"], "move-sink-input 12 ChromeSink\nmove-sink-input 13 ChromeSink\n")
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_unload_audio_modules_uses_one_pacmd_call(self, mock_run, _mock_pulsectl_module):
+        mock_run.return_value = MagicMock(returncode=0, stdout=">>> Module module-loopback not loaded.\n>>> ", stderr="")
+        self.recorder._chromesink_module_idx = "27"
+
+        self.recorder._unload_audio_modules()
+
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args.args[0], ["pacmd"])
+        self.assertIsNone(self.recorder._chromesink_module_idx)
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_move_sink_inputs_falls_back_to_pactl_without_pacmd(self, mock_run, _mock_pulsectl_module):
+        def fake_run(cmd, **kwargs):
+            if cmd == ["pacmd"]:
+                raise FileNotFoundError("pacmd")
+            return MagicMock(returncode=1 if cmd[2] == "13" else 0, stderr="Failure: No such entity")
+
+        mock_run.side_effect = fake_run
+
+        self.assertEqual(self.recorder._move_sink_inputs(["12", "13"], "ChromeSink"), {"13": "Failure: No such entity"})
+
+    def test_move_chrome_audio_stops_polling_when_no_new_streams_open(self, _mock_pulsectl_module):
+        chrome_sink_input = ("12", {"application.name": "Google Chrome"})
+
+        with patch.object(self.recorder, "_list_sink_inputs", return_value=[chrome_sink_input]), patch.object(self.recorder, "_move_sink_inputs", return_value={}) as mock_move, patch.object(self.recorder, "_wait_for_new_sink_input", return_value=False) as mock_wait:
+            self.assertTrue(self.recorder.move_chrome_audio_to_chromesink(poll_iterations=20, poll_delay=0.5))
+
+        mock_move.assert_called_once_with(["12"], "ChromeSink")
+        mock_wait.assert_called_once_with(0.5)
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_pulse_running_reuses_recent_answer(self, mock_run, _mock_pulsectl_module):
+        mock_run.return_value = MagicMock(returncode=0, stdout="Server Name: pulseaudio\n")
+
+        self.assertTrue(self.recorder._pulse_running())
+        self.assertTrue(self.recorder._pulse_running())
+        mock_run.assert_called_once()
+
+        self.recorder._close_pulse()
+        mock_run.return_value = MagicMock(returncode=1, stdout="")
+        self.assertFalse(self.recorder._pulse_running())
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.time.sleep")
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_start_pulseaudio_polls_until_server_answers(self, mock_run, mock_sleep, _mock_pulsectl_module):
+        pactl_info_results = iter([1, 1, 1, 0])
+
+        def fake_run(cmd, **kwargs):
+            if cmd[0] == "pactl":
+                return MagicMock(returncode=next(pactl_info_results), stdout="")
+            return MagicMock(returncode=0)
+
+        mock_run.side_effect = fake_run
+
+        self.assertTrue(self.recorder.start_pulseaudio_if_needed())
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [0.05, 0.1])
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_chromesink_check_trusts_loaded_module_until_disconnect(self, mock_run, _mock_pulsectl_module):
+        mock_run.return_value = MagicMock(returncode=0, stdout="1\tauto_null\tmodule-null-sink.c\ts16le 2ch 44100Hz\tIDLE\n", stderr="")
+        ScreenAndAudioRecorder._pactl_json_supported = False
+
+        self.recorder._chromesink_module_idx = "27"
+        self.assertTrue(self.recorder._check_pulseaudio_chromesink_exists())
+        mock_run.assert_not_called()
+
+        self.recorder._close_pulse()
+        self.assertFalse(self.recorder._check_pulseaudio_chromesink_exists())
+        mock_run.assert_called_once()
+
+    def test_sink_and_monitor_check_skipped_for_loaded_chromesink(self, _mock_pulsectl_module):
+        self.recorder._chromesink_module_idx = "27"
+
+        with patch.object(self.recorder, "_wait_for_pulse_objects") as mock_wait:
+            self.assertTrue(self.recorder.ensure_sink_and_monitor_exist())
+
+        mock_wait.assert_not_called()
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_diagnostics_skipped_when_info_logging_disabled(self, mock_run, _mock_pulsectl_module):
+        with patch("bots.bot_controller.screen_and_audio_recorder.logger.isEnabledFor", return_value=False):
+            self.recorder.diagnose_chrome_audio_routing()
+
+        mock_run.assert_not_called()
+
+    def test_wait_for_pulse_objects_wakes_on_new_source_event(self, _mock_pulsectl_module):
+        real_popen = subprocess.Popen
+
+        def fake_pactl_subscribe(*args, **kwargs):
+            return real_popen(["sh", "-c", "echo \"Event 'change' on sink #1\"; sleep 0.1; echo \"Event 'new' on source #5\"; sleep 5"], **kwargs)
+
+        with patch.object(ScreenAndAudioRecorder, "_pulse_objects_exist", side_effect=[False, True]) as mock_pulse_objects_exist, patch("bots.bot_controller.screen_and_audio_recorder.subprocess.Popen", side_effect=fake_pactl_subscribe):
+            started = time.monotonic()
+            self.assertTrue(self.recorder._wait_for_pulse_objects(source_name="ChromeSink.monitor", timeout_sec=3))
+
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(mock_pulse_objects_exist.call_count, 2)
+
+
+class TestScreenAndAudioRecorderAudioFallback(unittest.TestCase):
+    def setUp(self):
+        ScreenAndAudioRecorder.clear_audio_cache()
+        self.recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+
+    def tearDown(self):
+        ScreenAndAudioRecorder.clear_audio_cache()
+
+    def test_audio_detection_skipped_after_audio_recording_failed(self):
+        audio_options = ["-f", "pulse", "-i", "default"]
+        with patch.object(ScreenAndAudioRecorder, "_get_audio_input_options", return_value=audio_options) as mock_get_audio_input_options, patch.object(ScreenAndAudioRecorder, "_attempt_recording", side_effect=[False, True, True]) as mock_attempt_recording:
+            self.recorder.start_recording(":99")
+            other_recorder = ScreenAndAudioRecorder(file_location="/tmp/other_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+            other_recorder.start_recording(":99")
+
+        mock_get_audio_input_options.assert_called_once()
+        self.assertEqual(mock_attempt_recording.call_count, 3)
+        self.assertNotIn("pulse", mock_attempt_recording.call_args[0][0])
+
+    def test_audio_retried_once_audio_setup_changes_after_failure(self):
+        # Stand-in for ffmpeg that fails on the pulse input, and otherwise reports progress and keeps running
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fake_ffmpeg = os.path.join(temp_dir, "ffmpeg")
+            with open(fake_ffmpeg, "w") as f:
+                f.write('#!/bin/sh\ncase "$*" in *pulse*) echo "default: Input/output error" >&2; exit 1;; esac\necho progress=continue\nexec sleep 30\n')
+            os.chmod(fake_ffmpeg, 0o755)
+
+            recorders = []
+            audio_options = ["-f", "pulse", "-i", "default"]
+            with patch("bots.bot_controller.screen_and_audio_recorder._ffmpeg_path", return_value=fake_ffmpeg), patch.object(ScreenAndAudioRecorder, "_get_audio_input_options", return_value=audio_options) as mock_get_audio_input_options, patch.object(ScreenAndAudioRecorder, "_audio_host_fingerprint", return_value=(False, True, None)) as mock_fingerprint:
+                try:
+                    for _ in range(2):
+                        recorders.append(ScreenAndAudioRecorder(file_location=os.path.join(temp_dir, "recording.mp4"), recording_dimensions=(1920, 1080), audio_only=False))
+                        recorders[-1].start_recording(":99")
+                    # The failure is remembered for this audio setup, so the second recording didn't try audio
+                    self.assertEqual(mock_get_audio_input_options.call_count, 1)
+
+                    mock_fingerprint.return_value = (False, True, "unix:/run/user/1000/pulse/native")
+                    recorders.append(ScreenAndAudioRecorder(file_location=os.path.join(temp_dir, "recording.mp4"), recording_dimensions=(1920, 1080), audio_only=False))
+                    recorders[-1].start_recording(":99")
+                    self.assertEqual(mock_get_audio_input_options.call_count, 2)
+                finally:
+                    for recorder in recorders:
+                        recorder._stop_page_cache_trimming()
+                        if recorder.ffmpeg_proc:
+                            recorder.ffmpeg_proc.kill()
+                            recorder.ffmpeg_proc.wait()
+
+    def test_audio_input_precedes_video_input(self):
+        audio_options = ["-f", "pulse", "-i", "default"]
+        with patch.object(ScreenAndAudioRecorder, "_get_audio_input_options", return_value=audio_options), patch.object(ScreenAndAudioRecorder, "_attempt_recording", return_value=True) as mock_attempt_recording:
+            self.recorder.start_recording(":99")
+
+        ffmpeg_cmd = mock_attempt_recording.call_args[0][0]
+        self.assertLess(ffmpeg_cmd.index("pulse"), ffmpeg_cmd.index("x11grab"))
+        self.assertEqual(ffmpeg_cmd[ffmpeg_cmd.index("x11grab") :].count("-i"), 1)
+        self.assertEqual(ffmpeg_cmd[-1], "/tmp/test_recording.mp4")
+
+    def test_audio_only_captures_chromesink_in_mono_at_output_rate(self):
+        recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp3", recording_dimensions=(1920, 1080), audio_only=True)
+        with patch.object(ScreenAndAudioRecorder, "_get_audio_input_options", return_value=list(CHROMESINK_AUDIO_INPUT_OPTIONS)), patch.object(ScreenAndAudioRecorder, "_attempt_recording", return_value=True) as mock_attempt_recording:
+            recorder.start_recording(":99")
+
+        ffmpeg_cmd = mock_attempt_recording.call_args[0][0]
+        self.assertEqual(ffmpeg_cmd[ffmpeg_cmd.index("-channels") + 1], "1")
+        self.assertEqual(ffmpeg_cmd[ffmpeg_cmd.index("-sample_rate") + 1], ffmpeg_cmd[ffmpeg_cmd.index("-ar") + 1])
+
+
+class TestScreenAndAudioRecorderPaths(unittest.TestCase):
+    def test_get_seekable_path(self):
+        self.assertEqual(ScreenAndAudioRecorder.get_seekable_path("/tmp/file.webm"), "/tmp/file.seekable.webm")
+        self.assertEqual(ScreenAndAudioRecorder.get_seekable_path("/tmp/dir.v2/file.mp4"), "/tmp/dir.v2/file.seekable.mp4")
+        self.assertEqual(ScreenAndAudioRecorder.get_seekable_path("/tmp/file"), "/tmp/file.seekable")
+
+
+class TestScreenAndAudioRecorderVideoEncoding(unittest.TestCase):
+    def setUp(self):
+        self.recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_uses_libx264_by_default(self):
+        global_options, encode_options = self.recorder._get_video_encoding_options()
+        self.assertNotIn("-vaapi_device", global_options)
+        self.assertIn("libx264", encode_options)
+        self.assertEqual(encode_options[encode_options.index("-threads") + 1], "2")
+
+    @patch.dict(os.environ, {"FFMPEG_ENCODE_THREADS": "3"}, clear=True)
+    def test_encode_threads_can_be_overridden(self):
+        _, encode_options = self.recorder._get_video_encoding_options()
+        self.assertEqual(encode_options[encode_options.index("-threads") + 1], "3")
+
+    @patch.dict(os.environ, {"ENABLE_HW_ENCODE": "true"})
+    @patch("bots.bot_controller.screen_and_audio_recorder._detect_hw_encoder", return_value="h264_vaapi")
+    def test_uses_vaapi_when_enabled_and_available(self, _mock_detect_hw_encoder):
+        global_options, encode_options = self.recorder._get_video_encoding_options()
+        self.assertEqual(global_options[0], "-vaapi_device")
+        self.assertIn("h264_vaapi", encode_options)
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.shutil.which", return_value="/usr/bin/vainfo")
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.run")
+    def test_vaapi_requires_h264_encode_entrypoint(self, mock_run, _mock_which):
+        mock_run.return_value = MagicMock(returncode=0, stdout="      VAProfileH264Main               :\tVAEntrypointVLD\n")
+        self.assertFalse(_vaapi_can_encode_h264())
+
+        mock_run.return_value = MagicMock(returncode=0, stdout="      VAProfileH264Main               :\tVAEntrypointVLD\n      VAProfileH264Main               :\tVAEntrypointEncSliceLP\n")
+        self.assertTrue(_vaapi_can_encode_h264())
+
+
+class TestScreenAndAudioRecorderHealth(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_location = os.path.join(self.temp_dir.name, "recording.mp4")
+        self.recorder = ScreenAndAudioRecorder(file_location=self.file_location, recording_dimensions=(1920, 1080), audio_only=False)
+        self.recorder.ffmpeg_proc = MagicMock()
+        self.recorder.ffmpeg_proc.poll.return_value = None
+
+    def tearDown(self):
+        self.recorder.ffmpeg_proc = None
+        self.temp_dir.cleanup()
+
+    def test_health_reports_missing_file_after_startup_window(self):
+        self.recorder.recording_started_time = time.time() - 6
+        healthy, message = self.recorder.check_recording_health()
+        self.assertFalse(healthy)
+        self.assertIn("not created", message)
+
+    def test_health_reports_file_size(self):
+        with open(self.file_location, "wb") as f:
+            f.write(b"x" * 2048)
+        self.recorder.recording_started_time = time.time() - 20
+        healthy, message = self.recorder.check_recording_health()
+        self.assertTrue(healthy)
+        self.assertIn("2048 bytes", message)
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.PAGE_CACHE_TRIM_INTERVAL_SECONDS", 0.01)
+    @patch("bots.bot_controller.screen_and_audio_recorder.os.fdatasync")
+    @patch("bots.bot_controller.screen_and_audio_recorder.os.posix_fadvise")
+    def test_page_cache_trimming_runs_until_stopped(self, mock_posix_fadvise, mock_fdatasync):
+        with open(self.file_location, "wb") as f:
+            f.write(b"x" * 2048)
+        mock_sync_file_range = MagicMock(return_value=0)
+        stop_event = threading.Event()
+        with patch("bots.bot_controller.screen_and_audio_recorder._sync_file_range", return_value=mock_sync_file_range):
+            trim_thread = threading.Thread(target=self.recorder._trim_page_cache, args=(self.file_location, stop_event))
+            trim_thread.start()
+            time.sleep(0.1)
+            stop_event.set()
+            trim_thread.join(timeout=1)
+
+        self.assertFalse(trim_thread.is_alive())
+        # Writeback of the file is started once without waiting on it, and the range is dropped on later passes
+        mock_sync_file_range.assert_called_once()
+        self.assertEqual(mock_sync_file_range.call_args.args[1:], (0, 2048, 2))
+        self.assertEqual(mock_posix_fadvise.call_args.args[1:], (0, 2048, os.POSIX_FADV_DONTNEED))
+        mock_fdatasync.assert_not_called()
+
+
+class TestScreenAndAudioRecorderCleanup(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cleanup_skips_seekability_for_webm(self):
+        file_location = os.path.join(self.temp_dir.name, "recording.webm")
+        with open(file_location, "wb") as f:
+            f.write(b"x" * 4096)
+        recorder = ScreenAndAudioRecorder(file_location=file_location, recording_dimensions=(1920, 1080), audio_only=False)
+
+        with patch.object(ScreenAndAudioRecorder, "make_file_seekable") as mock_make_file_seekable:
+            recorder.cleanup()
+
+        mock_make_file_seekable.assert_not_called()
+
+    def test_cleanup_recovers_partial_recording(self):
+        file_location = os.path.join(self.temp_dir.name, "recording.mp4")
+        with open(file_location + ".part", "wb") as f:
+            f.write(b"partial")
+        recorder = ScreenAndAudioRecorder(file_location=file_location, recording_dimensions=(1920, 1080), audio_only=False)
+        recorder.recording_started_time = time.time() - 30
+
+        recorder.cleanup()
+
+        with open(file_location, "rb") as f:
+            self.assertEqual(f.read(), b"partial")
+        self.assertFalse(os.path.exists(file_location + ".part"))
+
+
+class TestScreenAndAudioRecorderStartup(unittest.TestCase):
+    def setUp(self):
+        self.recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+
+    def tearDown(self):
+        if self.recorder.ffmpeg_proc and self.recorder.ffmpeg_proc.poll() is None:
+            self.recorder.ffmpeg_proc.kill()
+            self.recorder.ffmpeg_proc.wait()
+        self.recorder.ffmpeg_proc = None
+
+    def test_wait_for_ready_returns_on_first_progress_report(self):
+        self.recorder.ffmpeg_proc = subprocess.Popen(["sh", "-c", "echo frame=0; echo progress=continue; sleep 5"], stdout=subprocess.PIPE)
+        started = time.monotonic()
+        self.recorder._wait_for_ffmpeg_ready(timeout_sec=3)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertIsNone(self.recorder.ffmpeg_proc.poll())
+
+    def test_wait_for_ready_returns_when_process_exits(self):
+        self.recorder.ffmpeg_proc = subprocess.Popen(["sh", "-c", "exit 1"], stdout=subprocess.PIPE)
+        self.recorder._wait_for_ffmpeg_ready(timeout_sec=3)
+        self.assertEqual(self.recorder.ffmpeg_proc.poll(), 1)
+
+    def test_ffmpeg_output_tail_is_kept_in_memory(self):
+        self.recorder.ffmpeg_proc = subprocess.Popen(["sh", "-c", "for i in $(seq 300); do echo line $i >&2; done; exit 1"], stderr=subprocess.PIPE)
+        self.recorder.ffmpeg_stderr_thread = threading.Thread(target=self.recorder._collect_lines, args=(self.recorder.ffmpeg_proc.stderr, self.recorder.ffmpeg_stderr_tail))
+        self.recorder.ffmpeg_stderr_thread.start()
+        self.recorder.ffmpeg_proc.wait()
+
+        output = self.recorder._get_ffmpeg_output()
+        self.assertEqual(len(output.splitlines()), 256)
+        self.assertTrue(output.endswith("line 300"))
+
+    def test_ffmpeg_is_launched_with_posix_spawn(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fake_ffmpeg = os.path.join(tmpdir, "ffmpeg")
+            with open(fake_ffmpeg, "w") as f:
+                f.write("#!/bin/sh\necho progress=continue\nexec sleep 5\n")
+            os.chmod(fake_ffmpeg, 0o755)
+
+            with patch("os.posix_spawn", wraps=os.posix_spawn) as mock_posix_spawn:
+                self.assertTrue(self.recorder._attempt_recording([fake_ffmpeg, "-i", ":99", self.recorder.file_location], ":99"))
+            self.recorder._stop_page_cache_trimming()
+
+        mock_posix_spawn.assert_called_once()
+
+    def test_wait_for_exit_blocks_until_exit_or_timeout(self):
+        proc = subprocess.Popen(["sleep", "30"])
+        with self.assertRaises(subprocess.TimeoutExpired):
+            _wait_for_exit(proc, timeout=0.1)
+
+        proc.send_signal(signal.SIGINT)
+        self.assertEqual(_wait_for_exit(proc, timeout=1), -signal.SIGINT)
+        # Already reaped
+        self.assertEqual(_wait_for_exit(proc, timeout=1), -signal.SIGINT)
+
+    def test_dropped_recorder_interrupts_ffmpeg(self):
+        recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+        proc = subprocess.Popen(["sleep", "30"])
+        recorder.ffmpeg_finalizer = weakref.finalize(recorder, _release_ffmpeg_proc, proc)
+
+        del recorder
+
+        self.assertEqual(proc.wait(timeout=1), -signal.SIGINT)
+
+
+class TestScreenAndAudioRecorderPause(unittest.TestCase):
+    def setUp(self):
+        self.recorder = ScreenAndAudioRecorder(file_location="/tmp/test_recording.mp4", recording_dimensions=(1920, 1080), audio_only=False)
+        self.recorder.ffmpeg_proc = subprocess.Popen(["sleep", "30"])
+
+    def tearDown(self):
+        self.recorder.ffmpeg_proc.kill()
+        self.recorder.ffmpeg_proc.wait()
+        self.recorder.ffmpeg_proc = None
+
+    def _wait_for_stopped_state(self, stopped):
+        # Signal delivery is asynchronous, give the kernel a moment to act on it
+        deadline = time.monotonic() + 1
+        while time.monotonic() < deadline:
+            with open(f"/proc/{self.recorder.ffmpeg_proc.pid}/stat") as f:
+                if (f.read().rsplit(")", 1)[1].split()[0] == "T") == stopped:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.Popen")
+    def test_pause_maps_blackout_window_instead_of_starting_xterm(self, mock_popen):
+        fake_xlib_display = MagicMock()
+        window = fake_xlib_display.Display.return_value.screen.return_value.root.create_window.return_value
+
+        with patch("bots.bot_controller.screen_and_audio_recorder._xlib_display_module", return_value=fake_xlib_display):
+            for _ in range(2):
+                self.assertTrue(self.recorder.pause_recording())
+                self.assertTrue(self.recorder.resume_recording())
+
+        fake_xlib_display.Display.assert_called_once()
+        self.assertEqual(window.map.call_count, 2)
+        self.assertEqual(window.unmap.call_count, 2)
+        self.assertFalse(any(call.args[0][0] == "xterm" for call in mock_popen.call_args_list))
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.Popen")
+    def test_sink_mute_uses_pulsectl_connection(self, mock_popen):
+        fake_pulsectl = MagicMock()
+        pulse = fake_pulsectl.Pulse.return_value
+
+        with patch("bots.bot_controller.screen_and_audio_recorder._pulsectl_module", return_value=fake_pulsectl):
+            self.recorder._set_sink_mute(True)
+            self.recorder._set_sink_mute(False)
+
+        fake_pulsectl.Pulse.assert_called_once_with("attendee-recorder-pause")
+        pulse.get_sink_by_name.assert_called_with(pulse.server_info.return_value.default_sink_name)
+        pulse.sink_mute.assert_called_with(pulse.get_sink_by_name.return_value.index, False)
+        mock_popen.assert_not_called()
+        # The client the meeting-join thread uses is never touched from the pause pool
+        self.assertIsNone(self.recorder._pulse)
+
+    @patch("bots.bot_controller.screen_and_audio_recorder.subprocess.Popen")
+    def test_resume_after_long_pause_leaves_ffmpeg_capturing(self, _mock_popen):
+        # ffmpeg keeps capturing the blackout while paused, so however long the pause lasts,
+        # x11grab has no backlog of frames to catch up on when it is resumed
+        with patch.object(self.recorder.ffmpeg_proc, "send_signal") as mock_send_signal:
+            self.assertTrue(self.recorder.pause_recording())
+            self.assertFalse(self._wait_for_stopped_state(True))
+            self.assertTrue(self.recorder.resume_recording())
+
+        mock_send_signal.assert_not_called()
+        self.assertIsNone(self.recorder.ffmpeg_proc.poll())
+
+
+if __name__ == "__main__":
+    unittest.main()